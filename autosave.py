@@ -0,0 +1,91 @@
+import threading
+import traceback
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer
+
+
+class AutosaveService(QObject):
+    """Coalesces save requests and runs all disk I/O on one worker thread.
+
+    `collect_state(compact)` runs on the GUI thread and must return changes
+    that are safe to serialize while the user keeps editing.
+    `write_state(changes)` runs on the worker. Jobs run strictly in the order
+    they were queued, so journal appends and snapshot writes never overtake
+    each other.
+    """
+
+    DEBOUNCE_MS = 400
+
+    def __init__(self, collect_state, write_state, parent=None):
+        super().__init__(parent)
+        self._collect_state = collect_state
+        self._write_state = write_state
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._submit)
+
+        self._cond = threading.Condition()
+        self._jobs = deque()
+        self._busy = False
+        self._closed = False
+
+        self._worker = threading.Thread(
+            target=self._run, name="excelify-autosave", daemon=True
+        )
+        self._worker.start()
+
+    def request_save(self):
+        # restart the quiet period; bursts collapse into one write
+        if self._closed:
+            return
+        self._timer.start()
+
+    def enqueue(self, func, *args):
+        """Run `func(*args)` on the worker after everything queued so far."""
+        with self._cond:
+            self._jobs.append((func, args))
+            self._cond.notify_all()
+
+    def flush(self, compact=False):
+        """Write any pending changes now and wait until they are on disk."""
+        if self._timer.isActive() or compact:
+            self._timer.stop()
+            self._submit(compact)
+
+        with self._cond:
+            while self._jobs or self._busy:
+                self._cond.wait()
+
+    def close(self):
+        if self._closed:
+            return
+        self.flush(compact=True)
+        self._closed = True
+        with self._cond:
+            self._cond.notify_all()
+        self._worker.join()
+
+    def _submit(self, compact=False):
+        self.enqueue(self._write_state, self._collect_state(compact))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closed:
+                    self._cond.wait()
+                if not self._jobs:
+                    return
+                func, args = self._jobs.popleft()
+                self._busy = True
+
+            try:
+                func(*args)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
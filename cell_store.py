@@ -0,0 +1,358 @@
+class CellStore:
+    """Sparse cell storage keyed like the old {(row, col): value} dict.
+
+    Cells are kept as {row: {col: value}}, with a second index
+    {col: {row, ...}} recording which rows are occupied in each column.
+    Reading a row touches only that row's cells, and a column is found
+    without scanning the sheet.
+
+    Those physical rows and columns sit behind a logical-to-physical
+    permutation: swapping two whole rows or columns only exchanges two
+    entries of the maps, whatever the size of the sheet. Every method
+    takes and returns logical coordinates. The maps only hold indices
+    that have been moved; everything else maps to itself.
+
+    The used range is cached and widened as cells are added. Deleting or
+    moving away the last cell of a boundary row or column only marks it
+    stale; it is recomputed the next time it is asked for.
+
+    rows_in() and items_in() yield only the filled cells inside a
+    rectangle.
+
+    Supports the mapping API existing callers use: get, [], in, len,
+    iteration over (row, col) keys, keys/values/items, pop, update and
+    clear. keys/values/items return one-shot iterators, not views. Empty
+    strings are never stored; callers pop instead.
+    """
+
+    def __init__(self, cells=None):
+        self._rows = {}
+        self._cols = {}
+        self._count = 0
+        # logical -> physical and physical -> logical, moved indices only
+        self._row_phys = {}
+        self._row_logical = {}
+        self._col_phys = {}
+        self._col_logical = {}
+        # (min_row, min_col, max_row, max_col) in logical coordinates
+        self._range = None
+        self._range_stale = False
+        if cells:
+            self.update(cells)
+
+    def _physical(self, row, col):
+        if self._row_phys:
+            row = self._row_phys.get(row, row)
+        if self._col_phys:
+            col = self._col_phys.get(col, col)
+        return row, col
+
+    # ---------- MAPPING API ----------
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __contains__(self, key):
+        row, col = self._physical(*key)
+        cols = self._rows.get(row)
+        return cols is not None and col in cols
+
+    def __getitem__(self, key):
+        row, col = self._physical(*key)
+        cols = self._rows.get(row)
+        if cols is None or col not in cols:
+            raise KeyError(key)
+        return cols[col]
+
+    def get(self, key, default=None):
+        row, col = self._physical(*key)
+        cols = self._rows.get(row)
+        if cols is None:
+            return default
+        return cols.get(col, default)
+
+    def __setitem__(self, key, value):
+        row, col = self._physical(*key)
+        cols = self._rows.get(row)
+        if cols is None:
+            cols = self._rows[row] = {}
+        if col not in cols:
+            self._count += 1
+            self._widen_range(*key)
+            rows = self._cols.get(col)
+            if rows is None:
+                rows = self._cols[col] = set()
+            rows.add(row)
+        cols[col] = value
+
+    def __delitem__(self, key):
+        row, col = self._physical(*key)
+        cols = self._rows.get(row)
+        if cols is None or col not in cols:
+            raise KeyError(key)
+        del cols[col]
+        row_emptied = not cols
+        if row_emptied:
+            del self._rows[row]
+        rows = self._cols[col]
+        rows.discard(row)
+        col_emptied = not rows
+        if col_emptied:
+            del self._cols[col]
+        self._count -= 1
+
+        if not self._count:
+            self._range = None
+            self._range_stale = False
+        elif self._range is not None:
+            min_row, min_col, max_row, max_col = self._range
+            if (row_emptied and key[0] in (min_row, max_row)) or (
+                col_emptied and key[1] in (min_col, max_col)
+            ):
+                self._range_stale = True
+
+    _MISSING = object()
+
+    def pop(self, key, default=_MISSING):
+        try:
+            value = self[key]
+        except KeyError:
+            if default is self._MISSING:
+                raise
+            return default
+        del self[key]
+        return value
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        for cols in self._rows.values():
+            yield from cols.values()
+
+    def items(self):
+        row_logical = self._row_logical
+        col_logical = self._col_logical
+        for row, cols in self._rows.items():
+            row = row_logical.get(row, row)
+            if col_logical:
+                for col, value in cols.items():
+                    yield (row, col_logical.get(col, col)), value
+            else:
+                for col, value in cols.items():
+                    yield (row, col), value
+
+    def update(self, cells):
+        items = cells.items() if hasattr(cells, "items") else cells
+        if self._row_phys or self._col_phys:
+            for key, value in items:
+                self[key] = value
+            return
+
+        # cheaper to recompute once than to widen per cell
+        self._range_stale = True
+
+        # __setitem__ inlined: this is the bulk path for loading a sheet
+        rows = self._rows
+        cols_index = self._cols
+        added = 0
+        for (row, col), value in items:
+            cols = rows.get(row)
+            if cols is None:
+                cols = rows[row] = {}
+            if col not in cols:
+                added += 1
+                occupied = cols_index.get(col)
+                if occupied is None:
+                    occupied = cols_index[col] = set()
+                occupied.add(row)
+            cols[col] = value
+        self._count += added
+
+    def clear(self):
+        self._rows.clear()
+        self._cols.clear()
+        self._count = 0
+        self._range = None
+        self._range_stale = False
+        for mapping in (self._row_phys, self._row_logical, self._col_phys, self._col_logical):
+            mapping.clear()
+
+    def copy(self):
+        copy = CellStore()
+        copy._rows = {row: dict(cols) for row, cols in self._rows.items()}
+        copy._cols = {col: set(rows) for col, rows in self._cols.items()}
+        copy._count = self._count
+        copy._row_phys = dict(self._row_phys)
+        copy._row_logical = dict(self._row_logical)
+        copy._col_phys = dict(self._col_phys)
+        copy._col_logical = dict(self._col_logical)
+        copy._range = self._range
+        copy._range_stale = self._range_stale
+        return copy
+
+    def __eq__(self, other):
+        if isinstance(other, (CellStore, dict)):
+            return len(other) == self._count and all(
+                self.get(key, self._MISSING) == value for key, value in other.items()
+            )
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CellStore({dict(self.items())!r})"
+
+    # ---------- ROWS AND COLUMNS ----------
+
+    def row(self, row):
+        """{col: value} for one row."""
+        cols = self._rows.get(self._row_phys.get(row, row), {})
+        col_logical = self._col_logical
+        if not col_logical:
+            return dict(cols)
+        return {col_logical.get(col, col): value for col, value in cols.items()}
+
+    def column(self, col):
+        """{row: value} for one column."""
+        phys = self._col_phys.get(col, col)
+        rows = self._rows
+        row_logical = self._row_logical
+        return {
+            row_logical.get(row, row): rows[row][phys]
+            for row in self._cols.get(phys, ())
+        }
+
+    def row_columns(self, row):
+        cols = self._rows.get(self._row_phys.get(row, row), {})
+        col_logical = self._col_logical
+        return {col_logical.get(col, col) for col in cols}
+
+    def column_rows(self, col):
+        rows = self._cols.get(self._col_phys.get(col, col), ())
+        row_logical = self._row_logical
+        return {row_logical.get(row, row) for row in rows}
+
+    def rows_in(self, top, left, bottom, right):
+        """Yield (row, {col: value}) for each filled row of a rectangle.
+
+        Walks the rectangle's rows or the occupied rows, whichever is
+        fewer, and likewise for columns within each row, so a huge
+        rectangle over a sparse sheet costs O(filled cells). Rows come in
+        no particular order.
+        """
+        rows = self._rows
+        row_phys = self._row_phys
+        row_logical = self._row_logical
+        col_phys = self._col_phys
+        col_logical = self._col_logical
+
+        if bottom - top < len(rows):
+            candidates = (
+                (row, rows.get(row_phys.get(row, row)))
+                for row in range(top, bottom + 1)
+            )
+        else:
+            candidates = (
+                (row_logical.get(row, row), cols) for row, cols in rows.items()
+            )
+
+        for row, cols in candidates:
+            if not cols or not top <= row <= bottom:
+                continue
+            if right - left < len(cols):
+                found = {}
+                for col in range(left, right + 1):
+                    value = cols.get(col_phys.get(col, col))
+                    if value is not None:
+                        found[col] = value
+            elif col_logical:
+                found = {}
+                for col, value in cols.items():
+                    col = col_logical.get(col, col)
+                    if left <= col <= right:
+                        found[col] = value
+            else:
+                found = {col: value for col, value in cols.items() if left <= col <= right}
+            if found:
+                yield row, found
+
+    def items_in(self, top, left, bottom, right):
+        """Yield ((row, col), value) for the filled cells of a rectangle."""
+        for row, cols in self.rows_in(top, left, bottom, right):
+            for col, value in cols.items():
+                yield (row, col), value
+
+    def occupied_rows(self):
+        row_logical = self._row_logical
+        return {row_logical.get(row, row) for row in self._rows}
+
+    def occupied_columns(self):
+        col_logical = self._col_logical
+        return {col_logical.get(col, col) for col in self._cols}
+
+    def swap_rows(self, r1, r2):
+        _swap(self._row_phys, self._row_logical, r1, r2)
+        if self._range is not None and not self._range_stale:
+            min_row, _, max_row, _ = self._range
+            for row in (r1, r2):
+                if self._row_phys.get(row, row) in self._rows:
+                    self._widen_range(row, self._range[1])
+                elif row in (min_row, max_row):
+                    self._range_stale = True
+
+    def swap_columns(self, c1, c2):
+        _swap(self._col_phys, self._col_logical, c1, c2)
+        if self._range is not None and not self._range_stale:
+            _, min_col, _, max_col = self._range
+            for col in (c1, c2):
+                if self._col_phys.get(col, col) in self._cols:
+                    self._widen_range(self._range[0], col)
+                elif col in (min_col, max_col):
+                    self._range_stale = True
+
+    # ---------- USED RANGE ----------
+
+    def _widen_range(self, row, col):
+        if self._range_stale:
+            return
+        if self._range is None:
+            self._range = (row, col, row, col)
+            return
+        min_row, min_col, max_row, max_col = self._range
+        if row < min_row or row > max_row or col < min_col or col > max_col:
+            self._range = (
+                min(min_row, row), min(min_col, col),
+                max(max_row, row), max(max_col, col),
+            )
+
+    def used_range(self):
+        """(min_row, min_col, max_row, max_col) of the occupied cells, or None."""
+        if self._range_stale:
+            self._range_stale = False
+            if self._count:
+                rows = self.occupied_rows()
+                cols = self.occupied_columns()
+                self._range = (min(rows), min(cols), max(rows), max(cols))
+            else:
+                self._range = None
+        return self._range
+
+
+def _swap(to_physical, to_logical, a, b):
+    if a == b:
+        return
+    pa = to_physical.get(a, a)
+    pb = to_physical.get(b, b)
+    for logical, physical in ((a, pb), (b, pa)):
+        if logical == physical:
+            to_physical.pop(logical, None)
+            to_logical.pop(physical, None)
+        else:
+            to_physical[logical] = physical
+            to_logical[physical] = logical
@@ -0,0 +1,195 @@
+"""Importing and exporting CSV and TSV files.
+
+The encoding and dialect are sniffed from the start of the file. Rows
+are parsed on a worker thread and their cells go straight into the
+sheet's CellStore on the GUI thread, a chunk at a time. Only a few
+chunks are ever waiting between the two threads, so a file of any size
+is read with bounded overhead.
+
+Export streams rows out of the sparse cells; the full rectangle is
+never built.
+"""
+
+import codecs
+import csv
+import io
+import os
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+from document import Sheet
+from import_chunks import CHUNK_CELLS, iter_cell_chunks
+
+# chunks the worker may read ahead of the GUI thread
+MAX_PENDING_CHUNKS = 4
+# bytes looked at to guess the encoding and dialect
+SNIFF_BYTES = 64 * 1024
+SNIFF_DELIMITERS = ",\t;|"
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def sniff_encoding(sample):
+    """Guess the encoding of a file from its first bytes."""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # final=False: the sample may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def sniff_dialect(text, path=""):
+    """Guess the csv dialect of `text`, the decoded start of a file.
+
+    Only the delimiter is guessed. Quoting always follows Excel ("" is a
+    quote inside a quoted cell): Sniffer's guesses for it are often
+    wrong, and then cells holding quotes split or merge. Falls back to
+    Excel's tab-separated dialect for .tsv/.tab files and to its
+    comma-separated one otherwise.
+    """
+    base = csv.excel_tab if path.lower().endswith((".tsv", ".tab")) else csv.excel
+    # the last line of the sample is usually cut short
+    cut = text.rfind("\n")
+    if cut > 0:
+        text = text[:cut]
+    try:
+        delimiter = csv.Sniffer().sniff(text, SNIFF_DELIMITERS).delimiter
+    except csv.Error:
+        return base
+    if base is csv.excel_tab and "\t" in text:
+        return base
+    if delimiter == base.delimiter:
+        return base
+    return type("sniffed", (base,), {"delimiter": delimiter})
+
+
+def iter_csv_chunks(lines, dialect, cancelled, chunk_cells=CHUNK_CELLS):
+    """Yield lists of ((row, col), text) for the filled cells of a file.
+
+    `lines` is a text file opened with newline="". Rows and columns are
+    0-based. Stops early once `cancelled()` returns True.
+    """
+    reader = csv.reader(lines, dialect)
+    try:
+        yield from iter_cell_chunks(reader, cancelled, chunk_cells)
+    except csv.Error as e:
+        raise csv.Error(f"line {reader.line_num}: {e}") from None
+
+
+def write_csv(cells, path, dialect=csv.excel):
+    """Write a sheet's cells to `path`, one row at a time.
+
+    Each row ends at its last filled cell and blank rows are empty lines.
+    The file is UTF-8 with a byte order mark, which Excel needs to
+    recognise it.
+    """
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, dialect)
+        next_row = 0
+        for row in sorted(cells.occupied_rows()):
+            if row > next_row:
+                f.write(dialect.lineterminator * (row - next_row))
+            values = cells.row(row)
+            line = [""] * (max(values) + 1)
+            for col, value in values.items():
+                line[col] = value
+            writer.writerow(line)
+            next_row = row + 1
+
+
+class CsvImport(QObject):
+    """Read a CSV or TSV file into a new sheet of `document`.
+
+    The sheet is appended to `document.sheets` once the whole file has
+    been read; `finished` then fires with True. A cancelled import adds
+    nothing and finishes with False.
+    """
+
+    # bytes read and file size; may not fit a C int
+    progress = Signal(object, object)
+    finished = Signal(bool)
+    failed = Signal(str)
+
+    # worker -> GUI thread
+    _cells_read = Signal(object, object)
+    _done = Signal(bool)
+    _error = Signal(str)
+
+    def __init__(self, path, document, sheet_name, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.document = document
+        self._sheet = Sheet(sheet_name)
+        self._size = 0
+        self._cancelled = threading.Event()
+        # released by the GUI thread as it stores each chunk
+        self._free_slots = threading.Semaphore(MAX_PENDING_CHUNKS)
+
+        self._cells_read.connect(self._on_cells_read)
+        self._done.connect(self._on_done)
+        self._error.connect(self.failed)
+
+    def start(self):
+        threading.Thread(target=self._run, name="excelify-csv-import", daemon=True).start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _run(self):
+        try:
+            for chunk, position in self._chunks():
+                if not self._hand_over(chunk, position):
+                    break
+        except (OSError, csv.Error) as e:
+            self._error.emit(str(e))
+            return
+
+        self._done.emit(not self._cancelled.is_set())
+
+    def _chunks(self):
+        """Yield (cells, position) from the worker thread; sets _size."""
+        self._size = os.path.getsize(self.path)
+        with open(self.path, "rb") as raw:
+            sample = raw.read(SNIFF_BYTES)
+            encoding = sniff_encoding(sample)
+            dialect = sniff_dialect(sample.decode(encoding, errors="replace"), self.path)
+            raw.seek(0)
+            # stray bad bytes past the sample should not fail the import
+            text = io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline="")
+            for chunk in iter_csv_chunks(text, dialect, self._cancelled.is_set):
+                yield chunk, raw.tell()
+
+    def _hand_over(self, chunk, position):
+        # wait for the GUI thread to catch up so unread chunks do not pile up
+        while not self._free_slots.acquire(timeout=0.2):
+            if self._cancelled.is_set():
+                return False
+        self._cells_read.emit(chunk, position)
+        return True
+
+    def _on_cells_read(self, chunk, position):
+        if not self._cancelled.is_set():
+            intern = self.document.strings.intern
+            self._sheet.cells.update((key, intern(value)) for key, value in chunk)
+            self.progress.emit(position, self._size)
+        self._free_slots.release()
+
+    def _on_done(self, completed):
+        sheet, self._sheet = self._sheet, None
+        if completed:
+            self.document.sheets.append(sheet)
+        self.finished.emit(completed)
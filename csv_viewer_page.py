@@ -0,0 +1,106 @@
+import os
+
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from editor_page import apply_grid_dark_mode
+from models.csv_view_model import CsvViewModel
+from views.table_view import TableView
+
+
+class CsvViewerPage(QWidget):
+    """Browse a large CSV file read-only, without importing it.
+
+    Rows can be copied, or promoted: the selected rows are imported into
+    a new document that can be edited.
+    """
+
+    promote_requested = Signal(object, object)  # MappedCsv, [(first, last), ...]
+
+    def __init__(self, source):
+        super().__init__()
+
+        self.source = source
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # ---------- TOOL RIBBON ----------
+        tool_ribbon = QWidget()
+        # styled like the grid editor's ribbon
+        tool_ribbon.setObjectName("editorRibbon")
+        tool_ribbon.setFixedHeight(72)
+
+        ribbon_layout = QHBoxLayout(tool_ribbon)
+        ribbon_layout.setContentsMargins(16, 0, 16, 0)
+
+        self.title_label = QLabel(f"{os.path.basename(source.path)} · read-only")
+        ribbon_layout.addWidget(self.title_label)
+
+        self.status_label = QLabel("Indexing…")
+        ribbon_layout.addWidget(self.status_label)
+
+        ribbon_layout.addStretch()
+
+        self.promote_btn = QPushButton("Promote to Editable Document")
+        self.promote_btn.setFixedHeight(36)
+        self.promote_btn.clicked.connect(self._request_promote)
+        ribbon_layout.addWidget(self.promote_btn)
+
+        layout.addWidget(tool_ribbon)
+
+        self.model = CsvViewModel(source, self)
+        self.view = TableView()
+        self.view.get_swap_mode = lambda: None
+        self.view.setModel(self.model)
+        layout.addWidget(self.view)
+
+        source.rows_indexed.connect(self._on_rows_indexed)
+        source.index_finished.connect(self._on_index_finished)
+        source.start_indexing()
+
+    def apply_grid_dark_mode(self, enabled: bool):
+        # the ribbon and grid share the editor's look
+        apply_grid_dark_mode(self, enabled)
+
+    def _on_rows_indexed(self, rows):
+        self.status_label.setText(f"Indexing… {rows:,} rows")
+
+    def _on_index_finished(self, rows):
+        self.status_label.setText(f"{rows:,} rows")
+
+    def selected_row_ranges(self):
+        """Sorted, merged (first, last) row ranges of the selection."""
+        spans = sorted(
+            (selection_range.top(), selection_range.bottom())
+            for selection_range in self.view.selectionModel().selection()
+        )
+        merged = []
+        for first, last in spans:
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+            else:
+                merged.append((first, last))
+        return merged
+
+    def _request_promote(self):
+        ranges = self.selected_row_ranges()
+        if not ranges:
+            QMessageBox.information(
+                self,
+                "Nothing Selected",
+                "Select the rows to import first."
+            )
+            return
+        self.promote_requested.emit(self.source, ranges)
+
+    def close_file(self):
+        self.source.close()
@@ -775,6 +775,7 @@ class DocEditorPage(QWidget):
 
     def _on_text_changed(self):
         self.document.content = self.editor.toPlainText()
+        self.document.dirty = True
         self.document_changed.emit()
 
     def _apply_font_size(self, size_text):
@@ -1,12 +1,140 @@
+import sys
+import uuid
+
+from cell_store import CellStore
+
+
+def new_id():
+    return uuid.uuid4().hex
+
+
+class StringPool:
+    """Per-document table of shared cell strings, like xlsx sharedStrings.
+
+    `intern` returns one canonical object per distinct value, so repeated
+    values (status codes, categories, city names) are stored once and
+    compare by identity first. Long values are rarely repeated and are
+    passed through untouched.
+
+    Values that are no longer used anywhere stay in the table until it has
+    grown well past its last rebuilt size; then the rebuild drops those
+    that nothing but the table still refers to. It goes by reference
+    counts rather than scanning cells, so it costs the size of the table,
+    and values held only by a sheet still being imported or by an undo
+    record are kept.
+    """
+
+    MAX_LENGTH = 64
+    MIN_REBUILD = 4096
+
+    def __init__(self):
+        self._strings = {}
+        self._rebuild_at = self.MIN_REBUILD
+
+    def __len__(self):
+        return len(self._strings)
+
+    def intern(self, value):
+        if len(value) > self.MAX_LENGTH:
+            return value
+        strings = self._strings
+        found = strings.get(value)
+        if found is not None:
+            return found
+        if len(strings) >= self._rebuild_at:
+            self.rebuild()
+            strings = self._strings
+        strings[value] = value
+        return value
+
+    def intern_cells(self, cells):
+        """Intern every value of a {(row, col): value} dict in place."""
+        intern = self.intern
+        for key, value in cells.items():
+            cells[key] = intern(value)
+        return cells
+
+    def rebuild(self):
+        # a value only the table refers to is counted four times: as key
+        # and as value, by `value` and by getrefcount's own argument
+        self._strings = {
+            value: value for value in self._strings
+            if sys.getrefcount(value) > 4
+        }
+        self._rebuild_at = max(self.MIN_REBUILD, 2 * len(self._strings))
+
+
+def _as_store(cells):
+    return cells if isinstance(cells, CellStore) else CellStore(cells)
+
+
 class Sheet:
     def __init__(self, name):
+        self.id = new_id()
         self.name = name
-        self.cells = {}   # {(row, col): value}
-        self.row_heights = {}  # {row: height}
-        self.col_widths = {}   # {col: width}
+        self._cells = CellStore()  # (row, col) -> value
+        self._row_heights = {}  # {row: height}
+        self._col_widths = {}   # {col: width}
+        # set by from_loader; cleared once the contents are read
+        self._loader = None
+        # True while this sheet has changes that are not on disk yet
+        self.dirty = True
+
+    @property
+    def is_loaded(self):
+        return self._loader is None
+
+    def _load(self):
+        loader = self._loader
+        self._loader = None
+        data = loader()
+        self._cells = _as_store(data["cells"])
+        # sizes already read from the metadata are newer than the file's
+        if self._row_heights is None:
+            self._row_heights = data["row_heights"]
+            self._col_widths = data["col_widths"]
+
+    @property
+    def cells(self):
+        if self._loader is not None:
+            self._load()
+        return self._cells
+
+    @cells.setter
+    def cells(self, value):
+        if self._row_heights is None:
+            # the sizes are only in the sheet file
+            self._load()
+        self._loader = None
+        self._cells = _as_store(value)
+
+    @property
+    def row_heights(self):
+        if self._row_heights is None:
+            self._load()
+        return self._row_heights
+
+    @row_heights.setter
+    def row_heights(self, value):
+        self._row_heights = value
+
+    @property
+    def col_widths(self):
+        if self._col_widths is None:
+            self._load()
+        return self._col_widths
+
+    @col_widths.setter
+    def col_widths(self, value):
+        self._col_widths = value
+
+    def used_range(self):
+        """(min_row, min_col, max_row, max_col) of the filled cells, or None."""
+        return self.cells.used_range()
 
     def to_dict(self):
         return {
+            "id": self.id,
             "name": self.name,
             "cells": {
                 f"{r},{c}": v for (r, c), v in self.cells.items()
@@ -15,35 +143,99 @@ class Sheet:
             "col_widths": {str(c): w for c, w in self.col_widths.items()},
         }
 
+    def to_meta(self):
+        """Name and section sizes; they change without touching cells."""
+        meta = {"id": self.id, "name": self.name}
+        if self._row_heights is not None:
+            meta["row_heights"] = {str(r): h for r, h in self._row_heights.items()}
+            meta["col_widths"] = {str(c): w for c, w in self._col_widths.items()}
+        return meta
+
+    def snapshot(self):
+        # shallow copies are enough: keys and values are immutable
+        copy = Sheet(self.name)
+        copy.id = self.id
+        copy.cells = self.cells.copy()
+        copy.row_heights = dict(self.row_heights)
+        copy.col_widths = dict(self.col_widths)
+        return copy
+
     @staticmethod
-    def from_dict(data):
+    def from_dict(data, strings=None):
         sheet = Sheet(data["name"])
+        sheet.id = data.get("id") or sheet.id
+        intern = strings.intern if strings is not None else str
         for key, value in data.get("cells", {}).items():
             r, c = map(int, key.split(","))
-            sheet.cells[(r, c)] = value
+            sheet.cells[(r, c)] = intern(value)
         sheet.row_heights = {
             int(r): h for r, h in data.get("row_heights", {}).items()
         }
         sheet.col_widths = {
             int(c): w for c, w in data.get("col_widths", {}).items()
         }
+        sheet.dirty = False
+        return sheet
+
+    @staticmethod
+    def from_loader(meta, loader):
+        """Sheet whose contents are read by `loader()` on first access.
+
+        `loader` returns {"cells": {(r, c): v} or a CellStore,
+        "row_heights": {r: h}, "col_widths": {c: w}}. Sizes in `meta`
+        take precedence; older metadata has none, and then they come
+        from the loader too.
+        """
+        sheet = Sheet(meta["name"])
+        sheet.id = meta["id"]
+        sheet._loader = loader
+        if "row_heights" in meta:
+            sheet._row_heights = {int(r): h for r, h in meta["row_heights"].items()}
+            sheet._col_widths = {int(c): w for c, w in meta["col_widths"].items()}
+        else:
+            sheet._row_heights = sheet._col_widths = None
+        sheet.dirty = False
         return sheet
 
 
 class Document:
     def __init__(self, name):
+        self.id = new_id()
         self.name = name
         self.type = "grid"
-        self.content = ""
+        self._content = ""
+        self._content_loader = None
         self.sheets = [Sheet("Sheet1")]
         self.active_sheet_index = 0
+        self.strings = StringPool()
+        # covers name, type, sheet list and content; cells are tracked per sheet
+        self.dirty = True
 
     @property
     def active_sheet(self):
         return self.sheets[self.active_sheet_index]
 
+    @property
+    def content(self):
+        if self._content_loader is not None:
+            loader = self._content_loader
+            self._content_loader = None
+            self._content = loader(self.id)
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content_loader = None
+        self._content = value
+
+    def mark_dirty(self):
+        self.dirty = True
+        for sheet in self.sheets:
+            sheet.dirty = True
+
     def to_dict(self):
         data = {
+            "id": self.id,
             "name": self.name,
             "type": self.type,
             "active_sheet_index": self.active_sheet_index,
@@ -55,19 +247,63 @@ class Document:
 
         return data
 
+    def to_meta(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "active_sheet_index": self.active_sheet_index,
+            "sheets": [sheet.to_meta() for sheet in self.sheets],
+        }
+
     @staticmethod
     def from_dict(data):
         doc = Document(data["name"])
+        doc.id = data.get("id") or doc.id
         doc.type = data.get("type", "grid")
         doc.content = data.get("content", "") if doc.type == "doc" else ""
         doc.sheets = [
-            Sheet.from_dict(s) for s in data.get("sheets", [])
+            Sheet.from_dict(s, doc.strings) for s in data.get("sheets", [])
         ]
         doc.active_sheet_index = data.get("active_sheet_index", 0)
+        doc.dirty = False
 
         # safety: ensure at least one sheet
         if not doc.sheets:
             doc.sheets = [Sheet("Sheet1")]
             doc.active_sheet_index = 0
+            doc.dirty = True
+
+        return doc
+
+    @staticmethod
+    def from_meta(meta, load_sheet, load_content=None):
+        """Document built from metadata only.
+
+        Sheets load on demand via `load_sheet(doc_id, sheet_meta)` and the
+        text of a "doc" document via `load_content(doc_id)`.
+        """
+        doc = Document(meta["name"])
+        doc.id = meta["id"]
+        doc.type = meta.get("type", "grid")
+        if doc.type == "doc" and load_content is not None:
+            doc._content_loader = load_content
+
+        def load(sheet_meta):
+            data = load_sheet(doc.id, sheet_meta)
+            doc.strings.intern_cells(data["cells"])
+            return data
+
+        doc.sheets = [
+            Sheet.from_loader(s, lambda s=s: load(s))
+            for s in meta.get("sheets", [])
+        ]
+        doc.active_sheet_index = meta.get("active_sheet_index", 0)
+        doc.dirty = False
+
+        if not doc.sheets:
+            doc.sheets = [Sheet("Sheet1")]
+            doc.active_sheet_index = 0
+            doc.dirty = True
 
         return doc
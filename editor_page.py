@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 from PySide6.QtWidgets import (
     QApplication,
     QCheckBox,
@@ -13,6 +15,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import (
     QItemSelectionModel,
+    QTimer,
     Signal,
     Qt,
 )
@@ -164,7 +167,17 @@ class ZoomBoxEdit(QPlainTextEdit):
 
 class EditorPage(QWidget):
     export_requested = Signal(object)  # document
+    csv_export_requested = Signal(object, object)  # document, sheet
     document_changed = Signal()
+    # forwarded from whichever sheet model made the change
+    save_requested = Signal()
+    cells_changed = Signal(object, object)  # sheet, {(row, col): value}
+    cells_permuted = Signal(object, object)  # sheet, PermutationRecord
+
+    ZOOM_WRITE_INTERVAL_MS = 300
+    # sheet models kept alive for instant switching; the undo history of
+    # an evicted model is kept and handed to the next one for that sheet
+    MODEL_CACHE_SIZE = 4
     
     def __init__(self, document):
         super().__init__()
@@ -172,7 +185,9 @@ class EditorPage(QWidget):
         self.document = document
         self.sheet_buttons = []
         self.swap_mode = None
-        self.model = TableModel(document)
+        self._models = OrderedDict()  # sheet id -> TableModel, oldest first
+        self._histories = {}  # sheet id -> UndoHistory
+        self._current_cells = {}  # sheet id -> (row, col) when last left
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -239,10 +254,17 @@ class EditorPage(QWidget):
 
         ribbon_layout.addWidget(self.export_btn)
 
+        self.export_csv_btn = QPushButton("Export to CSV")
+        self.export_csv_btn.setFixedHeight(36)
+        self.export_csv_btn.clicked.connect(
+            lambda: self.csv_export_requested.emit(self.document, self.model.sheet)
+        )
+        ribbon_layout.addWidget(self.export_csv_btn)
+
         layout.addWidget(tool_ribbon)
 
 
-        self.model = TableModel(document)
+        self.model = self._model_for_sheet(document.active_sheet)
         if not hasattr(self, "view"):
             self.view = TableView()
         self.view.get_swap_mode = lambda: self.swap_mode
@@ -256,6 +278,9 @@ class EditorPage(QWidget):
         self._restoring_sizes = False
         self._default_row_height = self.view.verticalHeader().defaultSectionSize()
         self._default_col_width = self.view.horizontalHeader().defaultSectionSize()
+        # non-default section sizes the headers currently show
+        self._shown_row_heights = {}
+        self._shown_col_widths = {}
         self.view.verticalHeader().sectionResized.connect(self._on_row_resized)
         self.view.horizontalHeader().sectionResized.connect(self._on_col_resized)
         self._apply_sheet_sizes()
@@ -263,6 +288,14 @@ class EditorPage(QWidget):
         self._zoom_box_ratio = (0.7, 0.1)
         self._zoom_syncing = False
         self._zoom_internal_edit = False
+        # typing in the zoom box is written to the model at most once per
+        # interval; every cell visit is one undo entry
+        self._zoom_write_timer = QTimer(self)
+        self._zoom_write_timer.setSingleShot(True)
+        self._zoom_write_timer.setInterval(self.ZOOM_WRITE_INTERVAL_MS)
+        self._zoom_write_timer.timeout.connect(self._push_zoom_text_to_model)
+        self._zoom_target = None
+        self._zoom_session = 0
         self._saved_edit_triggers = self.view.editTriggers()
         self._enter_moves_right = True
 
@@ -293,9 +326,6 @@ class EditorPage(QWidget):
         sel = self.view.selectionModel()
         sel.currentChanged.connect(self._on_current_changed)
         self.view.selection_finalized.connect(self._sync_zoom_box_to_current)
-        self.model.dataChanged.connect(self._on_model_data_changed)
-        self.model.layoutChanged.connect(self._on_model_layout_changed)
-        self.model.undo_state_changed.connect(self._update_undo_redo_state)
         self._update_undo_redo_state(self.model.can_undo(), self.model.can_redo())
 
         layout.addWidget(self.view)
@@ -357,24 +387,28 @@ class EditorPage(QWidget):
 
 
     def add_sheet(self):
+        self.flush_pending_edits()
+        self._deactivate_zoom_box()
+        self._remember_current_cell()
         count = len(self.document.sheets) + 1
         self.document.sheets.append(Sheet(f"Sheet{count}"))
         self.document.active_sheet_index = len(self.document.sheets) - 1
-        self.model.layoutChanged.emit()
-        self._update_undo_redo_state(self.model.can_undo(), self.model.can_redo())
+        self.document.dirty = True
+        self._show_active_sheet()
         self.refresh_sheet_buttons()
         self._deactivate_swaps()
-        self._deactivate_zoom_box()
-        self._apply_sheet_sizes()
         self.document_changed.emit()
     def switch_sheet(self, index):
+        self.flush_pending_edits()
+        # closed before the next sheet's current cell is restored, or the
+        # zoom box would write its text into that cell
+        self._deactivate_zoom_box()
+        self._remember_current_cell()
         self.document.active_sheet_index = index
-        self.model.layoutChanged.emit()
-        self._update_undo_redo_state(self.model.can_undo(), self.model.can_redo())
+        self.document.dirty = True
+        self._show_active_sheet()
         self.refresh_sheet_buttons()
         self._deactivate_swaps()
-        self._deactivate_zoom_box()
-        self._apply_sheet_sizes()
     def show_sheet_context_menu(self, index, button):
 
         menu = QMenu(self)
@@ -403,7 +437,9 @@ class EditorPage(QWidget):
         if not ok or not new_name.strip():
             return
 
+        # the name is document metadata; the sheet's cells are unchanged
         sheet.name = new_name.strip()
+        self.document.dirty = True
         self.refresh_sheet_buttons()
         self.document_changed.emit() 
     def delete_sheet(self, index):
@@ -428,20 +464,82 @@ class EditorPage(QWidget):
         if reply != QMessageBox.Yes:
             return
 
-        del self.document.sheets[index]
+        self.flush_pending_edits()
+        self._deactivate_zoom_box()
+        self._remember_current_cell()
+        sheet = self.document.sheets.pop(index)
 
         # adjust active sheet index
         if self.document.active_sheet_index >= len(self.document.sheets):
             self.document.active_sheet_index = len(self.document.sheets) - 1
+        self.document.dirty = True
 
-        self.model.layoutChanged.emit()
-        self._update_undo_redo_state(self.model.can_undo(), self.model.can_redo())
+        self._forget_sheet(sheet)
+        self._show_active_sheet()
         self.refresh_sheet_buttons()
         self._deactivate_swaps()
-        self._deactivate_zoom_box()
-        self._apply_sheet_sizes()
         self.document_changed.emit() 
+
+    # ---------- SHEET MODELS ----------
+
+    def _model_for_sheet(self, sheet):
+        model = self._models.get(sheet.id)
+        if model is not None:
+            self._models.move_to_end(sheet.id)
+            return model
+
+        model = TableModel(self.document, sheet, self._histories.get(sheet.id), parent=self)
+        self._histories[sheet.id] = model.history
+        model.save_requested.connect(self.save_requested)
+        model.cells_changed.connect(self.cells_changed)
+        model.cells_permuted.connect(self.cells_permuted)
+        model.dataChanged.connect(self._on_model_data_changed)
+        model.layoutChanged.connect(self._on_model_layout_changed)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.columnsInserted.connect(self._on_columns_inserted)
+        model.undo_state_changed.connect(self._update_undo_redo_state)
+        self._models[sheet.id] = model
+        return model
+
+    def _show_active_sheet(self):
+        sheet = self.document.active_sheet
+        self.model = self._model_for_sheet(sheet)
+        if self.view.model() is not self.model:
+            old_selection = self.view.selectionModel()
+            self.view.setModel(self.model)
+            old_selection.deleteLater()
+            self.view.selectionModel().currentChanged.connect(self._on_current_changed)
+            # the headers keep the section sizes they had for the previous
+            # sheet; _apply_sheet_sizes resets the ones this sheet lacks
+
+        while len(self._models) > self.MODEL_CACHE_SIZE:
+            _, evicted = self._models.popitem(last=False)
+            evicted.deleteLater()
+
+        self._apply_sheet_sizes()
+        current = self._current_cells.get(sheet.id)
+        if current is not None:
+            index = self.model.index(*current)
+            self.view.selectionModel().setCurrentIndex(
+                index, QItemSelectionModel.ClearAndSelect
+            )
+            self.view.scrollTo(index)
+        self._update_undo_redo_state(self.model.can_undo(), self.model.can_redo())
+
+    def _remember_current_cell(self):
+        index = self.view.currentIndex()
+        if index.isValid():
+            self._current_cells[self.model.sheet.id] = (index.row(), index.column())
+
+    def _forget_sheet(self, sheet):
+        model = self._models.pop(sheet.id, None)
+        if model is not None:
+            model.deleteLater()
+        self._histories.pop(sheet.id, None)
+        self._current_cells.pop(sheet.id, None)
+
     def handle_drag_swap(self, start_index, end_index):
+        self.flush_pending_edits()
         r1, c1 = start_index.row(), start_index.column()
         r2, c2 = end_index.row(), end_index.column()
 
@@ -459,6 +557,7 @@ class EditorPage(QWidget):
 
         self.document_changed.emit()
     def handle_block_swap(self, src_rect, dest_top_left):
+        self.flush_pending_edits()
         r1, c1, r2, c2 = src_rect
         dr, dc = dest_top_left
 
@@ -557,6 +656,7 @@ class EditorPage(QWidget):
         self.zoom_box.setFocus()
 
     def _hide_zoom_box(self):
+        self.flush_pending_edits()
         if self.zoom_box_host.isVisible():
             self._store_zoom_box_ratio()
             self.zoom_box_host.hide()
@@ -565,28 +665,62 @@ class EditorPage(QWidget):
             self.view.setEditTriggers(self._saved_edit_triggers)
 
     def _apply_sheet_sizes(self):
+        # only sections whose size differs between what the headers show
+        # now and what the active sheet wants are touched
         sheet = self.document.active_sheet
-        v_header = self.view.verticalHeader()
-        h_header = self.view.horizontalHeader()
         self._restoring_sizes = True
         try:
-            self._reset_header_sizes(
-                v_header, self.model.rowCount(), self._default_row_height
+            self._shown_row_heights = self._diff_header_sizes(
+                self.view.verticalHeader(),
+                self._shown_row_heights,
+                sheet.row_heights,
+                self._default_row_height,
             )
-            self._reset_header_sizes(
-                h_header, self.model.columnCount(), self._default_col_width
+            self._shown_col_widths = self._diff_header_sizes(
+                self.view.horizontalHeader(),
+                self._shown_col_widths,
+                sheet.col_widths,
+                self._default_col_width,
             )
-            for row, height in sheet.row_heights.items():
-                v_header.resizeSection(row, height)
-            for col, width in sheet.col_widths.items():
-                h_header.resizeSection(col, width)
         finally:
             self._restoring_sizes = False
 
-    def _reset_header_sizes(self, header, count, default_size):
-        header.setDefaultSectionSize(default_size)
-        for index in range(count):
+    def _diff_header_sizes(self, header, shown, wanted, default_size):
+        for index in shown.keys() - wanted.keys():
             header.resizeSection(index, default_size)
+        for index, size in wanted.items():
+            if shown.get(index) != size:
+                header.resizeSection(index, size)
+        return dict(wanted)
+
+    def _on_rows_inserted(self, parent, first, last):
+        # the grid grew: restore saved heights that fall in the new rows
+        self._restore_section_sizes(
+            self.view.verticalHeader(),
+            self.document.active_sheet.row_heights,
+            self._shown_row_heights,
+            first,
+            last,
+        )
+
+    def _on_columns_inserted(self, parent, first, last):
+        self._restore_section_sizes(
+            self.view.horizontalHeader(),
+            self.document.active_sheet.col_widths,
+            self._shown_col_widths,
+            first,
+            last,
+        )
+
+    def _restore_section_sizes(self, header, sizes, shown, first, last):
+        self._restoring_sizes = True
+        try:
+            for index, size in sizes.items():
+                if first <= index <= last:
+                    header.resizeSection(index, size)
+                    shown[index] = size
+        finally:
+            self._restoring_sizes = False
 
     def _on_row_resized(self, logical_index, old_size, new_size):
         if self._restoring_sizes:
@@ -594,8 +728,12 @@ class EditorPage(QWidget):
         sheet = self.document.active_sheet
         if new_size == self._default_row_height:
             sheet.row_heights.pop(logical_index, None)
+            self._shown_row_heights.pop(logical_index, None)
         else:
             sheet.row_heights[logical_index] = new_size
+            self._shown_row_heights[logical_index] = new_size
+        # sizes are saved with the document metadata, not the sheet's cells
+        self.document.dirty = True
         self.document_changed.emit()
 
     def _on_col_resized(self, logical_index, old_size, new_size):
@@ -604,8 +742,11 @@ class EditorPage(QWidget):
         sheet = self.document.active_sheet
         if new_size == self._default_col_width:
             sheet.col_widths.pop(logical_index, None)
+            self._shown_col_widths.pop(logical_index, None)
         else:
             sheet.col_widths[logical_index] = new_size
+            self._shown_col_widths[logical_index] = new_size
+        self.document.dirty = True
         self.document_changed.emit()
 
     def _update_zoom_box_size_from_ratio(self):
@@ -632,6 +773,9 @@ class EditorPage(QWidget):
     def _on_current_changed(self, current, previous):
         if not self.zoom_box_host.isVisible():
             return
+        # pending text belongs to the cell being left; with none pending
+        # the zoom box only shows that cell, and nothing is written
+        self.flush_pending_edits()
 
         if QApplication.mouseButtons() & Qt.LeftButton:
             return
@@ -647,6 +791,8 @@ class EditorPage(QWidget):
     def _sync_zoom_box_to_index(self, index):
         if not self.zoom_box_host.isVisible():
             return
+        self._zoom_session += 1
+        self._zoom_target = (index.row(), index.column()) if index.isValid() else None
         if not index.isValid():
             self._zoom_syncing = True
             self.zoom_box.clear_markers()
@@ -668,22 +814,37 @@ class EditorPage(QWidget):
             return
         if self._zoom_syncing:
             return
-        self._push_zoom_text_to_model()
+        if self._zoom_target is None:
+            index = self._ensure_current_index()
+            if not index.isValid():
+                return
+            self._zoom_target = (index.row(), index.column())
+        if not self._zoom_write_timer.isActive():
+            self._zoom_write_timer.start()
 
     def _push_zoom_text_to_model(self):
-        index = self._ensure_current_index()
-        if not index.isValid():
-            return
+        """Write pending zoom-box text to the cell it was typed for."""
+        self._zoom_write_timer.stop()
+        if self._zoom_target is None:
+            index = self._ensure_current_index()
+            if not index.isValid():
+                return
+            self._zoom_target = (index.row(), index.column())
 
+        row, col = self._zoom_target
         text = self.zoom_box.toPlainText()
-        current = self.model.data(index, Qt.EditRole) or ""
+        current = self.model.data(self.model.index(row, col), Qt.EditRole) or ""
         if text == current:
             return
 
         self._zoom_internal_edit = True
-        self.model.setData(index, text, Qt.EditRole)
+        self.model.write_typed_text(row, col, text, self._zoom_session)
         self._zoom_internal_edit = False
 
+    def flush_pending_edits(self):
+        if self._zoom_write_timer.isActive():
+            self._push_zoom_text_to_model()
+
     def _commit_zoom_box(self):
         if not self.zoom_box_host.isVisible():
             return
@@ -796,12 +957,7 @@ class EditorPage(QWidget):
             if reply != QMessageBox.Yes:
                 return
 
-        self.model.begin_compound_action()
-        try:
-            for row, col, value in values:
-                self.model.setData(self.model.index(row, col), value, Qt.EditRole)
-        finally:
-            self.model.end_compound_action()
+        self.model.write_cells({(row, col): value for row, col, value in values})
 
         last_row, last_col = targets[-1]
         self._set_current_index(last_row, last_col)
@@ -911,9 +1067,11 @@ class EditorPage(QWidget):
         self._sync_zoom_box_to_current()
 
     def _undo_action(self):
+        self.flush_pending_edits()
         self.model.undo()
 
     def _redo_action(self):
+        self.flush_pending_edits()
         self.model.redo()
 
     def _update_undo_redo_state(self, can_undo, can_redo):
@@ -933,6 +1091,7 @@ class EditorPage(QWidget):
             self._update_zoom_box_size_from_ratio()
 
     def hideEvent(self, event):
+        self.flush_pending_edits()
         if self.zoom_box_host.isVisible():
             self._store_zoom_box_ratio()
             self.zoom_box_host.hide()
@@ -941,255 +1100,42 @@ class EditorPage(QWidget):
         super().hideEvent(event)
 
     def apply_grid_dark_mode(self, enabled: bool):
-        if not enabled:
-            self.setStyleSheet("""
-            QWidget {
-                background-color: #f7f8fa;
-                color: #111827;
-            }
-
-            QWidget#editorRibbon {
-                background-color: #f9fafb;
-                border-bottom: 1px solid #e5e7eb;
-            }
-
-            QWidget#editorRibbon QPushButton,
-            QWidget#editorRibbon QToolButton {
-                background-color: #ffffff;
-                color: #111827;
-                border: 1px solid #e5e7eb;
-                border-radius: 8px;
-                padding: 6px 14px;
-                font-weight: 500;
-            }
-
-            QWidget#editorRibbon QPushButton:hover,
-            QWidget#editorRibbon QToolButton:hover {
-                background-color: #f3f4f6;
-                border: 1px solid #cbd5e1;
-            }
-
-            QWidget#editorRibbon QPushButton:focus,
-            QWidget#editorRibbon QToolButton:focus {
-                border: 1px solid #256d85;
-            }
-
-            QWidget#editorRibbon QPushButton:checked {
-                background-color: #256d85;
-                color: #ffffff;
-                border: 1px solid #256d85;
-            }
+        apply_grid_dark_mode(self, enabled)
 
-            QWidget#editorRibbon QPushButton:disabled,
-            QWidget#editorRibbon QToolButton:disabled {
-                color: #9ca3af;
-                background-color: #f3f4f6;
-                border: 1px solid #e5e7eb;
-            }
-
-            QPushButton[sheetButton="true"] {
-                background-color: #f3f4f6;
-                color: #4b5563;
-                border: 1px solid #e5e7eb;
-                border-radius: 6px;
-                padding: 0 12px;
-                font-weight: 400;
-            }
-
-            QPushButton[sheetButton="true"]:checked {
-                background-color: #256d85;
-                color: #ffffff;
-                border: 1px solid #256d85;
-                font-weight: 500;
-            }
-
-            QPushButton[sheetButton="true"]:hover {
-                background-color: #ffffff;
-                border: 1px solid #d1d5db;
-            }
-
-            QWidget#sheetBar QPushButton {
-                background-color: #f3f4f6;
-                color: #4b5563;
-                border: 1px solid #e5e7eb;
-                border-radius: 6px;
-            }
 
-            QWidget#sheetBar QPushButton[sheetButton="true"]:checked {
-                background-color: #256d85;
-                color: #ffffff;
-                border: 1px solid #256d85;
-            }
-
-            QTableView {
-                background-color: #ffffff;
-                gridline-color: #e5e7eb;
-                color: #111827;
-                selection-background-color: transparent;
-                selection-color: #111827;
-                border: 1px solid #e5e7eb;
-            }
-
-            QTableView::item:selected {
-                background-color: transparent;
-                color: #111827;
-            }
-
-            QAbstractScrollArea::viewport {
-                background-color: #ffffff;
-            }
-
-            QAbstractScrollArea::corner {
-                background: #f7f8fa;
-            }
-
-            QHeaderView {
-                background-color: #f9fafb;
-            }
-
-            QHeaderView::section {
-                background-color: #f3f4f6;
-                color: #374151;
-                border: 1px solid #e5e7eb;
-                border-bottom: 1px solid #d1d5db;
-                padding: 4px;
-            }
-
-            QTableCornerButton::section,
-            QTableView QTableCornerButton::section {
-                background-color: #f9fafb;
-                border: 1px solid #e5e7eb;
-            }
-
-            QWidget#sheetBar {
-                background-color: #f7f8fa;
-                border-top: 1px solid #e5e7eb;
-            }
-
-            QWidget#zoomBoxHost {
-                background-color: #f3f4f6;
-                border-top: 1px solid #e5e7eb;
-            }
-
-            QPlainTextEdit#zoomBox {
-                background-color: #ffffff;
-                color: #111827;
-                border: 1px solid #d1d5db;
-                border-radius: 8px;
-            }
-
-            QScrollBar:vertical, QScrollBar:horizontal {
-                background: #f3f4f6;
-                height: 10px;
-                width: 10px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical, QScrollBar::handle:horizontal {
-                background: #d1d5db;
-                min-height: 24px;
-                min-width: 24px;
-                border-radius: 4px;
-            }
-            QScrollBar::handle:vertical:hover, QScrollBar::handle:horizontal:hover {
-                background: #9ca3af;
-            }
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical,
-            QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {
-                background: #f3f4f6;
-            }
-            QScrollBar::add-line:vertical,
-            QScrollBar::sub-line:vertical,
-            QScrollBar::add-line:horizontal,
-            QScrollBar::sub-line:horizontal {
-                height: 0px;
-                width: 0px;
-            }
-            """)
-            return
-
-        self.setStyleSheet("""
+def apply_grid_dark_mode(widget, enabled: bool):
+    """Style `widget` like the grid editor: its ribbon, sheet bar and grid."""
+    if not enabled:
+        widget.setStyleSheet("""
         QWidget {
-            background-color: #202124;
-            color: #eaeaea;
+            background-color: #f7f8fa;
+            color: #111827;
         }
 
         QWidget#editorRibbon {
-            background-color: #252525;
-            border-bottom: 1px solid rgba(255, 255, 255, 0.06);
+            background-color: #f9fafb;
+            border-bottom: 1px solid #e5e7eb;
         }
 
         QWidget#editorRibbon QPushButton,
         QWidget#editorRibbon QToolButton {
-            background-color: #2a2a2a;
-            color: #eaeaea;
-            border: 1px solid rgba(255, 255, 255, 0.06);
+            background-color: #ffffff;
+            color: #111827;
+            border: 1px solid #e5e7eb;
             border-radius: 8px;
             padding: 6px 14px;
             font-weight: 500;
         }
 
-        QWidget#editorRibbon QToolButton {
-            background-color: #2d2d30;
-            color: #e6e6e6;
-            border: 1px solid #3a3a3a;
-            border-radius: 6px;
-            padding: 4px 12px;
-        }
-
-        QWidget#editorRibbon QToolButton {
-            background-color: #2d2d30;
-            color: #e6e6e6;
-            border: 1px solid #3a3a3a;
-            border-radius: 6px;
-            padding: 4px 12px;
-        }
-
-        QWidget#editorRibbon QToolButton {
-            background-color: #2d2d30;
-            color: #e6e6e6;
-            border: 1px solid #3a3a3a;
-            border-radius: 6px;
-            padding: 4px 12px;
-        }
-
-        QWidget#editorRibbon QToolButton {
-            background-color: #2d2d30;
-            color: #e6e6e6;
-            border: 1px solid #3a3a3a;
-            border-radius: 6px;
-            padding: 4px 12px;
-        }
-
-        QWidget#editorRibbon QToolButton {
-            background-color: #2d2d30;
-            color: #e6e6e6;
-            border: 1px solid #3a3a3a;
-            border-radius: 6px;
-            padding: 4px 12px;
-        }
-
-        QWidget#editorRibbon QToolButton {
-            background-color: #2d2d30;
-            color: #e6e6e6;
-            border: 1px solid #3a3a3a;
-            border-radius: 6px;
-            padding: 4px 12px;
-        }
-
-        QWidget#editorRibbon QToolButton {
-            background-color: #2d2d30;
-            color: #e6e6e6;
-            border: 1px solid #3a3a3a;
-            border-radius: 6px;
-            padding: 4px 12px;
-        }
-
-        QWidget#editorRibbon QPushButton:hover {
-            background-color: #3a3a3a;
+        QWidget#editorRibbon QPushButton:hover,
+        QWidget#editorRibbon QToolButton:hover {
+            background-color: #f3f4f6;
+            border: 1px solid #cbd5e1;
         }
 
-        QWidget#editorRibbon QToolButton:hover {
-            background-color: #3a3a3a;
+        QWidget#editorRibbon QPushButton:focus,
+        QWidget#editorRibbon QToolButton:focus {
+            border: 1px solid #256d85;
         }
 
         QWidget#editorRibbon QPushButton:checked {
@@ -1200,52 +1146,15 @@ class EditorPage(QWidget):
 
         QWidget#editorRibbon QPushButton:disabled,
         QWidget#editorRibbon QToolButton:disabled {
-            color: #a0a0a0;
-            background-color: #2a2a2a;
-        }
-
-        QWidget#editorRibbon QToolButton:disabled {
-            color: #9e9e9e;
-            background-color: #2a2a2a;
-        }
-
-        QWidget#editorRibbon QToolButton:disabled {
-            color: #9e9e9e;
-            background-color: #2a2a2a;
-        }
-
-        QWidget#editorRibbon QToolButton:disabled {
-            color: #9e9e9e;
-            background-color: #2a2a2a;
-        }
-
-        QWidget#editorRibbon QToolButton:disabled {
-            color: #9e9e9e;
-            background-color: #2a2a2a;
-        }
-
-        QWidget#editorRibbon QToolButton:disabled {
-            color: #9e9e9e;
-            background-color: #2a2a2a;
-        }
-
-        QWidget#editorRibbon QToolButton:disabled {
-            color: #9e9e9e;
-            background-color: #2a2a2a;
-        }
-
-        QWidget#editorRibbon QToolButton:disabled {
-            color: #9e9e9e;
-            background-color: #2a2a2a;
+            color: #9ca3af;
+            background-color: #f3f4f6;
+            border: 1px solid #e5e7eb;
         }
 
-        /* ===============================
-        SHEET BUTTONS (NOT QTabBar!)
-        =============================== */
         QPushButton[sheetButton="true"] {
-            background-color: #2a2a2a;
-            color: #a0a0a0;
-            border: 1px solid rgba(255, 255, 255, 0.06);
+            background-color: #f3f4f6;
+            color: #4b5563;
+            border: 1px solid #e5e7eb;
             border-radius: 6px;
             padding: 0 12px;
             font-weight: 400;
@@ -1259,14 +1168,14 @@ class EditorPage(QWidget):
         }
 
         QPushButton[sheetButton="true"]:hover {
-            background-color: #2e2e2e;
-            border: 1px solid rgba(255, 255, 255, 0.10);
+            background-color: #ffffff;
+            border: 1px solid #d1d5db;
         }
 
         QWidget#sheetBar QPushButton {
-            background-color: #2a2a2a;
-            color: #a0a0a0;
-            border: 1px solid rgba(255, 255, 255, 0.06);
+            background-color: #f3f4f6;
+            color: #4b5563;
+            border: 1px solid #e5e7eb;
             border-radius: 6px;
         }
 
@@ -1277,80 +1186,80 @@ class EditorPage(QWidget):
         }
 
         QTableView {
-            background-color: #252525;
-            gridline-color: rgba(255, 255, 255, 0.06);
-            color: #eaeaea;
+            background-color: #ffffff;
+            gridline-color: #e5e7eb;
+            color: #111827;
             selection-background-color: transparent;
-            selection-color: #eaeaea;
-            border: 1px solid rgba(255, 255, 255, 0.06);
+            selection-color: #111827;
+            border: 1px solid #e5e7eb;
         }
 
         QTableView::item:selected {
             background-color: transparent;
-            color: #eaeaea;
+            color: #111827;
         }
 
         QAbstractScrollArea::viewport {
-            background-color: #252525;
+            background-color: #ffffff;
         }
 
         QAbstractScrollArea::corner {
-            background: #202124;
+            background: #f7f8fa;
         }
 
         QHeaderView {
-            background-color: #202124;
+            background-color: #f9fafb;
         }
 
         QHeaderView::section {
-            background-color: #2a2a2a;
-            color: #eaeaea;
-            border: 1px solid rgba(255, 255, 255, 0.06);
-            border-bottom: 1px solid rgba(255, 255, 255, 0.10);
+            background-color: #f3f4f6;
+            color: #374151;
+            border: 1px solid #e5e7eb;
+            border-bottom: 1px solid #d1d5db;
             padding: 4px;
         }
 
         QTableCornerButton::section,
         QTableView QTableCornerButton::section {
-            background-color: #202124;
-            border: 1px solid rgba(255, 255, 255, 0.06);
+            background-color: #f9fafb;
+            border: 1px solid #e5e7eb;
         }
 
         QWidget#sheetBar {
-            background-color: #202124;
-            border-top: 1px solid rgba(255, 255, 255, 0.06);
+            background-color: #f7f8fa;
+            border-top: 1px solid #e5e7eb;
         }
 
         QWidget#zoomBoxHost {
-            background-color: #2a2a2a;
-            border-top: 1px solid rgba(255, 255, 255, 0.06);
+            background-color: #f3f4f6;
+            border-top: 1px solid #e5e7eb;
         }
 
         QPlainTextEdit#zoomBox {
-            background-color: #202124;
-            color: #eaeaea;
-            border: 1px solid rgba(255, 255, 255, 0.06);
+            background-color: #ffffff;
+            color: #111827;
+            border: 1px solid #d1d5db;
             border-radius: 8px;
         }
 
         QScrollBar:vertical, QScrollBar:horizontal {
-            background: #202124;
+            background: #f3f4f6;
             height: 10px;
             width: 10px;
             margin: 0px;
         }
         QScrollBar::handle:vertical, QScrollBar::handle:horizontal {
-            background: #2e2e2e;
+            background: #d1d5db;
             min-height: 24px;
             min-width: 24px;
             border-radius: 4px;
         }
         QScrollBar::handle:vertical:hover, QScrollBar::handle:horizontal:hover {
-            background: #3a3a3a;
+            background: #9ca3af;
         }
         QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical,
         QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {
-            background: #202124;
+            background: #f3f4f6;
         }
         QScrollBar::add-line:vertical,
         QScrollBar::sub-line:vertical,
@@ -1360,3 +1269,258 @@ class EditorPage(QWidget):
             width: 0px;
         }
         """)
+        return
+
+    widget.setStyleSheet("""
+    QWidget {
+        background-color: #202124;
+        color: #eaeaea;
+    }
+
+    QWidget#editorRibbon {
+        background-color: #252525;
+        border-bottom: 1px solid rgba(255, 255, 255, 0.06);
+    }
+
+    QWidget#editorRibbon QPushButton,
+    QWidget#editorRibbon QToolButton {
+        background-color: #2a2a2a;
+        color: #eaeaea;
+        border: 1px solid rgba(255, 255, 255, 0.06);
+        border-radius: 8px;
+        padding: 6px 14px;
+        font-weight: 500;
+    }
+
+    QWidget#editorRibbon QToolButton {
+        background-color: #2d2d30;
+        color: #e6e6e6;
+        border: 1px solid #3a3a3a;
+        border-radius: 6px;
+        padding: 4px 12px;
+    }
+
+    QWidget#editorRibbon QToolButton {
+        background-color: #2d2d30;
+        color: #e6e6e6;
+        border: 1px solid #3a3a3a;
+        border-radius: 6px;
+        padding: 4px 12px;
+    }
+
+    QWidget#editorRibbon QToolButton {
+        background-color: #2d2d30;
+        color: #e6e6e6;
+        border: 1px solid #3a3a3a;
+        border-radius: 6px;
+        padding: 4px 12px;
+    }
+
+    QWidget#editorRibbon QToolButton {
+        background-color: #2d2d30;
+        color: #e6e6e6;
+        border: 1px solid #3a3a3a;
+        border-radius: 6px;
+        padding: 4px 12px;
+    }
+
+    QWidget#editorRibbon QToolButton {
+        background-color: #2d2d30;
+        color: #e6e6e6;
+        border: 1px solid #3a3a3a;
+        border-radius: 6px;
+        padding: 4px 12px;
+    }
+
+    QWidget#editorRibbon QToolButton {
+        background-color: #2d2d30;
+        color: #e6e6e6;
+        border: 1px solid #3a3a3a;
+        border-radius: 6px;
+        padding: 4px 12px;
+    }
+
+    QWidget#editorRibbon QToolButton {
+        background-color: #2d2d30;
+        color: #e6e6e6;
+        border: 1px solid #3a3a3a;
+        border-radius: 6px;
+        padding: 4px 12px;
+    }
+
+    QWidget#editorRibbon QPushButton:hover {
+        background-color: #3a3a3a;
+    }
+
+    QWidget#editorRibbon QToolButton:hover {
+        background-color: #3a3a3a;
+    }
+
+    QWidget#editorRibbon QPushButton:checked {
+        background-color: #256d85;
+        color: #ffffff;
+        border: 1px solid #256d85;
+    }
+
+    QWidget#editorRibbon QPushButton:disabled,
+    QWidget#editorRibbon QToolButton:disabled {
+        color: #a0a0a0;
+        background-color: #2a2a2a;
+    }
+
+    QWidget#editorRibbon QToolButton:disabled {
+        color: #9e9e9e;
+        background-color: #2a2a2a;
+    }
+
+    QWidget#editorRibbon QToolButton:disabled {
+        color: #9e9e9e;
+        background-color: #2a2a2a;
+    }
+
+    QWidget#editorRibbon QToolButton:disabled {
+        color: #9e9e9e;
+        background-color: #2a2a2a;
+    }
+
+    QWidget#editorRibbon QToolButton:disabled {
+        color: #9e9e9e;
+        background-color: #2a2a2a;
+    }
+
+    QWidget#editorRibbon QToolButton:disabled {
+        color: #9e9e9e;
+        background-color: #2a2a2a;
+    }
+
+    QWidget#editorRibbon QToolButton:disabled {
+        color: #9e9e9e;
+        background-color: #2a2a2a;
+    }
+
+    QWidget#editorRibbon QToolButton:disabled {
+        color: #9e9e9e;
+        background-color: #2a2a2a;
+    }
+
+    /* ===============================
+    SHEET BUTTONS (NOT QTabBar!)
+    =============================== */
+    QPushButton[sheetButton="true"] {
+        background-color: #2a2a2a;
+        color: #a0a0a0;
+        border: 1px solid rgba(255, 255, 255, 0.06);
+        border-radius: 6px;
+        padding: 0 12px;
+        font-weight: 400;
+    }
+
+    QPushButton[sheetButton="true"]:checked {
+        background-color: #256d85;
+        color: #ffffff;
+        border: 1px solid #256d85;
+        font-weight: 500;
+    }
+
+    QPushButton[sheetButton="true"]:hover {
+        background-color: #2e2e2e;
+        border: 1px solid rgba(255, 255, 255, 0.10);
+    }
+
+    QWidget#sheetBar QPushButton {
+        background-color: #2a2a2a;
+        color: #a0a0a0;
+        border: 1px solid rgba(255, 255, 255, 0.06);
+        border-radius: 6px;
+    }
+
+    QWidget#sheetBar QPushButton[sheetButton="true"]:checked {
+        background-color: #256d85;
+        color: #ffffff;
+        border: 1px solid #256d85;
+    }
+
+    QTableView {
+        background-color: #252525;
+        gridline-color: rgba(255, 255, 255, 0.06);
+        color: #eaeaea;
+        selection-background-color: transparent;
+        selection-color: #eaeaea;
+        border: 1px solid rgba(255, 255, 255, 0.06);
+    }
+
+    QTableView::item:selected {
+        background-color: transparent;
+        color: #eaeaea;
+    }
+
+    QAbstractScrollArea::viewport {
+        background-color: #252525;
+    }
+
+    QAbstractScrollArea::corner {
+        background: #202124;
+    }
+
+    QHeaderView {
+        background-color: #202124;
+    }
+
+    QHeaderView::section {
+        background-color: #2a2a2a;
+        color: #eaeaea;
+        border: 1px solid rgba(255, 255, 255, 0.06);
+        border-bottom: 1px solid rgba(255, 255, 255, 0.10);
+        padding: 4px;
+    }
+
+    QTableCornerButton::section,
+    QTableView QTableCornerButton::section {
+        background-color: #202124;
+        border: 1px solid rgba(255, 255, 255, 0.06);
+    }
+
+    QWidget#sheetBar {
+        background-color: #202124;
+        border-top: 1px solid rgba(255, 255, 255, 0.06);
+    }
+
+    QWidget#zoomBoxHost {
+        background-color: #2a2a2a;
+        border-top: 1px solid rgba(255, 255, 255, 0.06);
+    }
+
+    QPlainTextEdit#zoomBox {
+        background-color: #202124;
+        color: #eaeaea;
+        border: 1px solid rgba(255, 255, 255, 0.06);
+        border-radius: 8px;
+    }
+
+    QScrollBar:vertical, QScrollBar:horizontal {
+        background: #202124;
+        height: 10px;
+        width: 10px;
+        margin: 0px;
+    }
+    QScrollBar::handle:vertical, QScrollBar::handle:horizontal {
+        background: #2e2e2e;
+        min-height: 24px;
+        min-width: 24px;
+        border-radius: 4px;
+    }
+    QScrollBar::handle:vertical:hover, QScrollBar::handle:horizontal:hover {
+        background: #3a3a3a;
+    }
+    QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical,
+    QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {
+        background: #202124;
+    }
+    QScrollBar::add-line:vertical,
+    QScrollBar::sub-line:vertical,
+    QScrollBar::add-line:horizontal,
+    QScrollBar::sub-line:horizontal {
+        height: 0px;
+        width: 0px;
+    }
+    """)
@@ -183,6 +183,7 @@ class HomePage(QWidget):
     def sync_rename(self, document):
     # update the card text
         self.cards[document].update_name()
+        document.dirty = True
         self.save_requested.emit()
     def on_search_text(self, text):
         self.chrome.update_search_results(self._visible_documents(), text)
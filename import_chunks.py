@@ -0,0 +1,32 @@
+"""Cells read by an importer, in chunks for the GUI thread.
+
+CsvImport and WorkbookImport read on a worker thread and hand the cells
+they find to the GUI thread CHUNK_CELLS at a time, checking for a cancel
+every CANCEL_CHECK_ROWS rows.
+"""
+
+# cells handed to the GUI thread at a time
+CHUNK_CELLS = 50000
+# rows read between checks for cancellation
+CANCEL_CHECK_ROWS = 1024
+
+
+def iter_cell_chunks(rows, cancelled, chunk_cells=CHUNK_CELLS):
+    """Yield lists of ((row, col), text) for the filled cells of `rows`.
+
+    `rows` yields one sequence of values per row; rows and columns are
+    0-based. None and "" are blank, anything else is stored as its str().
+    Stops early once `cancelled()` returns True.
+    """
+    chunk = []
+    for row, values in enumerate(rows):
+        for col, value in enumerate(values):
+            if value is not None and value != "":
+                chunk.append(((row, col), str(value)))
+        if len(chunk) >= chunk_cells:
+            yield chunk
+            chunk = []
+        if row % CANCEL_CHECK_ROWS == 0 and cancelled():
+            return
+    if chunk:
+        yield chunk
@@ -1,18 +1,45 @@
+import csv
 import os
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QFileDialog, QMessageBox
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QFileDialog, QMessageBox, QProgressDialog
 from top_chrome import TopChrome
 from home_page import HomePage
 from editor_page import EditorPage
 from doc_editor_page import DocEditorPage
-from storage import save_state, load_state
-from document import Document
-from storage import save_state, load_state
+from storage import open_workspace_store
+from document import Document, Sheet
 from PySide6.QtWidgets import QFileDialog, QMessageBox
-from openpyxl import Workbook, load_workbook
 from docx import Document as DocxDocument
 from PySide6.QtGui import QPalette, QColor
 from PySide6.QtWidgets import QApplication
-
+from autosave import AutosaveService
+from views.clipboard import detach_clipboard
+from workbook_import import WorkbookImport
+from csv_io import CsvImport, write_csv
+from csv_viewer_page import CsvViewerPage
+from mapped_csv import MappedCsv, MappedRowsImport
+
+CSV_EXTENSIONS = (".csv", ".tsv", ".tab", ".txt")
+# CSV files this large are offered in the read-only viewer first
+CSV_VIEWER_MIN_BYTES = 100 * 1024 * 1024
+
+
+def _xlsx_rows(sheet):
+    """Rows of a sheet for a write-only worksheet, in order.
+
+    Only filled cells get a value; openpyxl skips the None placeholders
+    before them, and rows with nothing in them are empty.
+    """
+    cells = sheet.cells
+    next_row = 0
+    for row in sorted(cells.occupied_rows()):
+        for _ in range(row - next_row):
+            yield ()
+        values = cells.row(row)
+        line = [None] * (max(values) + 1)
+        for col, value in values.items():
+            line[col] = value
+        yield line
+        next_row = row + 1
 
 
 class MainWindow(QMainWindow):
@@ -37,9 +64,17 @@ class MainWindow(QMainWindow):
         self.home.open_document_requested.connect(self.open_editor_for_document)
         self.home.save_requested.connect(self.save_app_state)
 
+        self.store = open_workspace_store()
+        self.autosave = AutosaveService(
+            lambda compact: self.store.collect(self.home.documents, compact),
+            self.store.write,
+            self,
+        )
+
         self.load_app_state()
         
         self.editor = None
+        self._import_job = None
 
         self.container_layout.addWidget(self.chrome)
         self.container_layout.addWidget(self.home)
@@ -53,6 +88,7 @@ class MainWindow(QMainWindow):
 
     def go_home(self):
         if self.editor:
+            self._flush_editor()
             self.container_layout.removeWidget(self.editor)
             self.editor.deleteLater()
             self.editor = None
@@ -70,6 +106,7 @@ class MainWindow(QMainWindow):
         self.home.set_home_mode(getattr(document, "type", "grid"))
 
         if self.editor:
+            self._flush_editor()
             self.container_layout.removeWidget(self.editor)
             self.editor.deleteLater()
 
@@ -83,9 +120,16 @@ class MainWindow(QMainWindow):
 
         if isinstance(self.editor, EditorPage):
             # ✅ CONNECT SAVE HERE (parent is now MainWindow)
-            self.editor.model.save_requested.connect(self.save_app_state)
+            self.editor.save_requested.connect(self.save_app_state)
+            self.editor.cells_changed.connect(
+                lambda sheet, written, doc=document: self._record_cell_changes(doc, sheet, written)
+            )
+            self.editor.cells_permuted.connect(
+                lambda sheet, record, doc=document: self._record_permutation(doc, sheet, record)
+            )
             self.editor.document_changed.connect(self.save_app_state)
             self.editor.export_requested.connect(self.export_document_to_excel)
+            self.editor.csv_export_requested.connect(self.export_sheet_to_csv)
         else:
             self.editor.document_changed.connect(self.save_app_state)
             self.editor.export_requested.connect(self.export_document_to_docs)
@@ -98,46 +142,33 @@ class MainWindow(QMainWindow):
         # apply grid dark mode if enabled
 
     def save_app_state(self):
-        state = {
-            "documents": [doc.to_dict() for doc in self.home.documents]
-        }
-        save_state(state)
+        self.autosave.request_save()
 
-    def load_app_state(self):
-        state = load_state()
-        if not state:
-            return
+    def _record_cell_changes(self, document, sheet, written):
+        line = self.store.record(document, sheet, written)
+        self.autosave.enqueue(self.store.append_journal, line)
 
-        for doc_data in state.get("documents", []):
-            doc = Document.from_dict(doc_data)
-            self.home.documents.append(doc)
-            self.home.add_existing_document(doc)
+    def _record_permutation(self, document, sheet, record):
+        line = self.store.record_permutation(document, sheet, record)
+        self.autosave.enqueue(self.store.append_journal, line)
 
-    def load_app_state(self):
-        state = load_state()
-        if not state:
-            return
+    def _flush_editor(self):
+        # text still waiting in the zoom box must reach the model first
+        if isinstance(self.editor, EditorPage):
+            self.editor.flush_pending_edits()
+        elif isinstance(self.editor, CsvViewerPage):
+            self.editor.close_file()
+
+    def closeEvent(self, event):
+        self._flush_editor()
+        self.autosave.close()
+        detach_clipboard()
+        super().closeEvent(event)
 
-        for doc_data in state.get("documents", []):
-            doc = Document.from_dict(doc_data)
+    def load_app_state(self):
+        for doc in self.store.load():
             self.home.documents.append(doc)
             self.home.add_existing_document(doc)
-    def export_document_to_excel(self, document):
-        path, _ = QFileDialog.getSaveFileName(
-            self,
-            "Export to Excel",
-            f"{document.name}.xlsx",
-            "Excel Files (*.xlsx)"
-        )
-
-        if not path:
-            return
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = document.name[:31]  # Excel limit
-
-        # determine grid bounds
     def export_document_to_excel(self, document):
         from openpyxl import Workbook
         from PySide6.QtWidgets import QFileDialog, QMessageBox
@@ -152,11 +183,8 @@ class MainWindow(QMainWindow):
         if not path:
             return
 
-        wb = Workbook()
-
-        # remove default sheet
-        default_ws = wb.active
-        wb.remove(default_ws)
+        # write-only workbooks stream each row to disk as it is appended
+        wb = Workbook(write_only=True)
 
         has_data = False
 
@@ -167,15 +195,8 @@ class MainWindow(QMainWindow):
                 continue
 
             has_data = True
-            used_cells = sheet.cells.keys()
-
-            max_row = max(r for r, _ in used_cells)
-            max_col = max(c for _, c in used_cells)
-
-            for row in range(max_row + 1):
-                for col in range(max_col + 1):
-                    value = sheet.cells.get((row, col), "")
-                    ws.cell(row=row + 1, column=col + 1, value=value)
+            for row in _xlsx_rows(sheet):
+                ws.append(row)
 
         if not has_data:
             QMessageBox.information(
@@ -192,63 +213,244 @@ class MainWindow(QMainWindow):
             "Export Complete",
             "Excel file exported successfully."
         )
+
+    def _import_busy(self):
+        # one import at a time; each owns its progress dialog
+        if self._import_job is None:
+            return False
+        QMessageBox.information(
+            self,
+            "Import in Progress",
+            "Wait for the current import to finish."
+        )
+        return True
+
+    def _make_progress_dialog(self, job, title, label):
+        dialog = QProgressDialog(label, "Cancel", 0, 0, self)
+        dialog.setWindowTitle(title)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.setMinimumDuration(300)
+        dialog.canceled.connect(job.cancel)
+        return dialog
+
     def import_excel(self):
         path, _ = QFileDialog.getOpenFileName(
             self,
             "Import Excel File",
             "",
-            "Excel Files (*.xlsx)"
+            "Spreadsheets (*.xlsx *.csv *.tsv *.tab *.txt);;"
+            "Excel Files (*.xlsx);;"
+            "CSV / TSV Files (*.csv *.tsv *.tab *.txt)"
         )
 
         if not path:
             return
 
+        if path.lower().endswith(CSV_EXTENSIONS):
+            self.import_csv(path)
+            return
+
         if not path.lower().endswith(".xlsx"):
             QMessageBox.warning(
                 self,
                 "Invalid File",
-                "Only .xlsx files are supported."
+                "Only .xlsx, .csv and .tsv files are supported."
             )
             return
 
-        try:
-            wb = load_workbook(path, data_only=True)
-        except Exception as e:
+        if self._import_busy():
+            return
+
+        doc_name = path.split("/")[-1].rsplit(".", 1)[0]
+        document = Document(doc_name)
+        document.sheets.clear()
+
+        job = WorkbookImport(path, document, self)
+        dialog = self._make_progress_dialog(job, "Import Excel File", "Opening workbook…")
+
+        def on_progress(index, count, title, rows):
+            dialog.setRange(0, count)
+            dialog.setValue(index)
+            label = f"Reading sheet {index + 1} of {count}: {title}"
+            if rows:
+                label += f"\n{rows:,} rows"
+            dialog.setLabelText(label)
+
+        def on_sheet_added(sheet, done, count):
+            # the card appears with the first sheet; later ones join it
+            if done == 1:
+                self.home.documents.append(document)
+                self.home.add_existing_document(document)
+            elif isinstance(self.editor, EditorPage) and self.editor.document is document:
+                self.editor.refresh_sheet_buttons()
+            self.save_app_state()
+
+        def on_finished(completed):
+            dialog.close()
+            self._import_job = None
+            if completed and not document.sheets:
+                document.sheets.append(Sheet("Sheet1"))
+                self.home.documents.append(document)
+                self.home.add_existing_document(document)
+                self.save_app_state()
+
+        def on_failed(message):
+            dialog.close()
+            self._import_job = None
             QMessageBox.critical(
                 self,
                 "Import Failed",
+                f"Could not open file:\n{message}"
+            )
+
+        job.progress.connect(on_progress)
+        job.sheet_added.connect(on_sheet_added)
+        job.finished.connect(on_finished)
+        job.failed.connect(on_failed)
+        self._import_job = job
+        job.start()
+
+    def import_csv(self, path):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0  # reported by the import
+        if size >= CSV_VIEWER_MIN_BYTES:
+            box = QMessageBox(self)
+            box.setWindowTitle("Large File")
+            box.setText(
+                f"{os.path.basename(path)} is {size // (1024 * 1024):,} MB.\n\n"
+                "Open it read-only without importing, or import it as a new document?"
+            )
+            view_button = box.addButton("Open Read-Only", QMessageBox.AcceptRole)
+            import_button = box.addButton("Import", QMessageBox.ActionRole)
+            box.addButton(QMessageBox.Cancel)
+            box.exec()
+            if box.clickedButton() is view_button:
+                self.open_csv_viewer(path)
+                return
+            if box.clickedButton() is not import_button:
+                return
+
+        if self._import_busy():
+            return
+
+        doc_name = os.path.splitext(os.path.basename(path))[0]
+        document = Document(doc_name)
+        document.sheets.clear()
+
+        job = CsvImport(path, document, doc_name[:31], self)
+        self._start_csv_import(job, document, f"Reading {os.path.basename(path)}…")
+
+    def open_csv_viewer(self, path):
+        try:
+            source = MappedCsv(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(
+                self,
+                "Open Failed",
                 f"Could not open file:\n{e}"
             )
             return
 
-        # create new document
-        from document import Document, Sheet
+        if self.editor:
+            self._flush_editor()
+            self.container_layout.removeWidget(self.editor)
+            self.editor.deleteLater()
+
+        self.editor = CsvViewerPage(source)
+        self.editor.apply_grid_dark_mode(self.is_grid_dark)
+        self.editor.promote_requested.connect(self.promote_csv_rows)
 
-        doc_name = path.split("/")[-1].rsplit(".", 1)[0]
+        self.container_layout.addWidget(self.editor)
+        self.home.hide()
+        self.chrome.show_editor_mode()
+        self.container_layout.activate()
+        self.container.updateGeometry()
+
+    def promote_csv_rows(self, source, row_ranges):
+        if self._import_busy():
+            return
+
+        doc_name = os.path.splitext(os.path.basename(source.path))[0]
         document = Document(doc_name)
         document.sheets.clear()
 
-        for ws in wb.worksheets:
-            sheet = Sheet(ws.title)
+        job = MappedRowsImport(source, row_ranges, document, doc_name[:31], self)
+        self._start_csv_import(job, document, "Importing selected rows…", open_when_done=True)
+
+    def _start_csv_import(self, job, document, label, open_when_done=False):
+        dialog = self._make_progress_dialog(job, "Import CSV File", label)
+
+        def on_progress(done, total):
+            # QProgressDialog takes ints; bytes can be out of range
+            dialog.setRange(0, 1000)
+            dialog.setValue(done * 1000 // max(total, 1))
+
+        def on_finished(completed):
+            dialog.close()
+            self._import_job = None
+            if not completed:
+                return
+            self.home.documents.append(document)
+            self.home.add_existing_document(document)
+            self.save_app_state()
+            if open_when_done:
+                self.open_editor_for_document(document)
+
+        def on_failed(message):
+            dialog.close()
+            self._import_job = None
+            QMessageBox.critical(
+                self,
+                "Import Failed",
+                f"Could not read file:\n{message}"
+            )
 
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None:
-                        r = cell.row - 1
-                        c = cell.column - 1
-                        sheet.cells[(r, c)] = str(cell.value)
+        job.progress.connect(on_progress)
+        job.finished.connect(on_finished)
+        job.failed.connect(on_failed)
+        self._import_job = job
+        job.start()
 
-            document.sheets.append(sheet)
+    def export_sheet_to_csv(self, document, sheet):
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Export to CSV",
+            # CSV holds one sheet; name the file after it when there are several
+            f"{document.name}.csv" if len(document.sheets) == 1
+            else f"{document.name} - {sheet.name}.csv",
+            "CSV Files (*.csv);;TSV Files (*.tsv)"
+        )
 
-        if not document.sheets:
-            document.sheets.append(Sheet("Sheet1"))
+        if not path:
+            return
 
-        document.active_sheet_index = 0
+        if not sheet.cells:
+            QMessageBox.information(
+                self,
+                "Nothing to Export",
+                "This sheet has no data."
+            )
+            return
 
-        # add to home page
-        self.home.documents.append(document)
-        self.home.add_existing_document(document)
-        self.save_app_state()
+        is_tsv = path.lower().endswith(".tsv") or selected_filter.startswith("TSV")
+        try:
+            write_csv(sheet.cells, path, csv.excel_tab if is_tsv else csv.excel)
+        except OSError as e:
+            QMessageBox.critical(
+                self,
+                "Export Failed",
+                f"Could not write file:\n{e}"
+            )
+            return
+
+        QMessageBox.information(
+            self,
+            "Export Complete",
+            "Sheet exported successfully."
+        )
 
     def import_docs(self):
         path, _ = QFileDialog.getOpenFileName(
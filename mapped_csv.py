@@ -0,0 +1,249 @@
+"""Read-only access to CSV files too large to import.
+
+MappedCsv memory-maps the file and indexes it on a worker thread. The
+index is sparse: it records the byte offset of every STRIPE_ROWS-th row,
+so even a file with tens of millions of rows needs only a small list.
+A row is read by parsing its stripe from the map; the most recently
+used stripes are kept parsed.
+
+MappedRowsImport copies chosen rows of a MappedCsv into a new sheet,
+using the chunked path of CsvImport.
+"""
+
+import csv
+import io
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from itertools import accumulate
+
+from PySide6.QtCore import QObject, Signal
+
+from csv_io import SNIFF_BYTES, CsvImport, sniff_dialect, sniff_encoding
+from import_chunks import CHUNK_CELLS
+
+# rows per index entry, and per parse when a row is read
+STRIPE_ROWS = 256
+# parsed stripes kept, most recently used last
+CACHED_STRIPES = 64
+# bytes indexed between progress reports and checks for closing
+SCAN_BYTES = 8 * 1024 * 1024
+
+
+class MappedCsv(QObject):
+    """A CSV or TSV file served row by row straight from disk.
+
+    `rows_indexed` reports how many rows are known so far while the
+    index is built; `index_finished` fires once with the final count.
+    Rows past the count reported so far are not readable yet.
+
+    UTF-16 files are not supported: their line breaks are not single
+    bytes. Open raises ValueError for them.
+    """
+
+    rows_indexed = Signal(int)
+    index_finished = Signal(int)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            sample = self._file.read(SNIFF_BYTES)
+            self.encoding = sniff_encoding(sample)
+            if self.encoding == "utf-16":
+                raise ValueError("UTF-16 files can only be imported, not viewed.")
+            text = sample.decode(self.encoding, errors="replace")
+            self.dialect = sniff_dialect(text, path)
+            self.sample_columns = max(
+                (len(row) for row in self._parse_text(text.rsplit("\n", 1)[0])),
+                default=1,
+            )
+            size = os.path.getsize(path)
+            # an empty file cannot be mapped
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        except Exception:
+            self._file.close()
+            raise
+
+        self.size = len(self._map)
+        self._offsets = []  # byte offset of rows 0, STRIPE_ROWS, 2 * STRIPE_ROWS, ...
+        self._row_count = 0  # rows whose start and end are both indexed
+        self._indexed_to = 0  # bytes scanned
+        self._finished = False
+        self._closed = False
+        self._stop = threading.Event()
+        self._cache = OrderedDict()  # stripe -> [row, ...]
+
+    # ---------- INDEX ----------
+
+    def start_indexing(self):
+        threading.Thread(target=self._build_index, name="excelify-csv-index", daemon=True).start()
+
+    @property
+    def row_count(self):
+        return self._row_count
+
+    @property
+    def is_indexed(self):
+        return self._finished
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _build_index(self):
+        data = self._map
+        size = self.size
+        offsets = self._offsets
+        quote = None
+        if self.dialect.quoting != csv.QUOTE_NONE and self.dialect.quotechar:
+            # ASCII in every encoding viewed here
+            quote = self.dialect.quotechar.encode()
+        rows = 0
+        in_quotes = False
+        pos = 0
+
+        while pos < size:
+            try:
+                end = data.find(b"\n", min(pos + SCAN_BYTES, size) - 1)
+                end = size if end == -1 else end + 1
+                block = data[pos:end]
+            except ValueError:
+                # unmapped by close()
+                return
+            lines = block.split(b"\n")
+            if not lines[-1]:
+                lines.pop()
+
+            if quote is None or (not in_quotes and quote not in block):
+                # every line is a row
+                first = -rows % STRIPE_ROWS
+                if first < len(lines):
+                    starts = list(accumulate((len(line) + 1 for line in lines), initial=pos))
+                    offsets.extend(starts[first:len(lines):STRIPE_ROWS])
+                rows += len(lines)
+            else:
+                # a line break inside quotes does not end the row; "" keeps
+                # the count of quotes even, so odd counts toggle the state
+                start = pos
+                for line in lines:
+                    if not in_quotes:
+                        if rows % STRIPE_ROWS == 0:
+                            offsets.append(start)
+                        rows += 1
+                    if line.count(quote) & 1:
+                        in_quotes = not in_quotes
+                    start += len(line) + 1
+
+            pos = end
+            self._indexed_to = pos
+            # a row still open in quotes is not readable yet
+            self._row_count = rows - 1 if in_quotes else rows
+            if self._stop.is_set():
+                return
+            self.rows_indexed.emit(self._row_count)
+
+        self._row_count = rows
+        self._finished = True
+        self.index_finished.emit(rows)
+
+    # ---------- ROWS ----------
+
+    def _parse_text(self, text):
+        try:
+            return list(csv.reader(io.StringIO(text, newline=""), self.dialect))
+        except csv.Error:
+            # a damaged stripe is shown as plain lines rather than not at all
+            return [line.split(self.dialect.delimiter) for line in text.splitlines()]
+
+    def _parse_stripe(self, stripe):
+        offsets = self._offsets
+        start = offsets[stripe]
+        end = offsets[stripe + 1] if stripe + 1 < len(offsets) else self._indexed_to
+        try:
+            data = self._map[start:end]
+        except ValueError:
+            # unmapped by close()
+            return []
+        return self._parse_text(data.decode(self.encoding, errors="replace"))
+
+    def row(self, row):
+        """The values of `row` as a list, parsed on first use."""
+        if self._closed or not 0 <= row < self._row_count:
+            return []
+        stripe, line = divmod(row, STRIPE_ROWS)
+        rows = self._cache.get(stripe)
+        if rows is not None:
+            self._cache.move_to_end(stripe)
+        else:
+            rows = self._parse_stripe(stripe)
+            # the last stripe may still be growing; only keep finished ones
+            if stripe + 1 < len(self._offsets) or self._finished:
+                self._cache[stripe] = rows
+                if len(self._cache) > CACHED_STRIPES:
+                    self._cache.popitem(last=False)
+        return rows[line] if line < len(rows) else []
+
+    def iter_rows(self, first, last):
+        """Yield (row, values) for rows first..last, bypassing the cache.
+
+        Safe to call from a worker thread.
+        """
+        last = min(last, self._row_count - 1)
+        row = first
+        while row <= last:
+            stripe, line = divmod(row, STRIPE_ROWS)
+            rows = self._parse_stripe(stripe)[line:line + last - row + 1]
+            if not rows:
+                return
+            for values in rows:
+                yield row, values
+                row += 1
+
+    def close(self):
+        """Stop indexing and unmap the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._cache.clear()
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+class MappedRowsImport(CsvImport):
+    """Copy rows of a MappedCsv into a new sheet of `document`.
+
+    `row_ranges` is a list of (first, last) rows; they are written one
+    under the other from the top of the sheet. `progress` counts rows.
+    """
+
+    def __init__(self, source, row_ranges, document, sheet_name, parent=None):
+        super().__init__(source.path, document, sheet_name, parent)
+        self._source = source
+        self._row_ranges = row_ranges
+
+    def _chunks(self):
+        self._size = sum(last - first + 1 for first, last in self._row_ranges)
+        chunk = []
+        out_row = 0
+        for first, last in self._row_ranges:
+            for _, values in self._source.iter_rows(first, last):
+                for col, value in enumerate(values):
+                    if value:
+                        chunk.append(((out_row, col), value))
+                out_row += 1
+                if len(chunk) >= CHUNK_CELLS:
+                    yield chunk, out_row
+                    chunk = []
+                if self._cancelled.is_set():
+                    return
+        if self._source.closed:
+            # the viewer went away; its rows stopped short
+            self._cancelled.set()
+            return
+        if chunk:
+            yield chunk, out_row
@@ -0,0 +1,166 @@
+"""Undo entries for TableModel.
+
+A cell edit becomes a BlockRecord when its cells fill most of their
+bounding rectangle, and a SparseRecord otherwise. Whole-row and
+whole-column swaps are PermutationRecords. Every record reports an
+approximate `cost` in bytes, which UndoHistory uses to stay within its
+memory budget.
+
+Cell records count their value slots plus the strings they hold. Each
+distinct string is counted once per record, in full, even when the
+sheet or another record shares it, so the estimate errs high. The cost
+of a cell record is fixed when it is created; typing merged into it
+later does not change it, which keeps UndoHistory's running total exact.
+"""
+
+import sys
+
+# rough CPython sizes, only used to weigh records against each other
+_SLOT_BYTES = 8
+_SPARSE_ENTRY_BYTES = 150
+_RECORD_BYTES = 64
+
+# a block may hold cells that did not change, up to half its area
+_MIN_BLOCK_DENSITY = 0.5
+
+
+def _string_bytes(values):
+    distinct = set(values)
+    distinct.discard("")
+    return sum(map(sys.getsizeof, distinct))
+
+
+class BlockRecord:
+    """Cell edit over a rectangle, stored as two row-major value arrays.
+
+    `before` and `after` hold one value per cell of the rectangle ("" for
+    empty); either may be None when every cell on that side is empty, as
+    after a clear or before a paste into blank cells.
+    """
+
+    def __init__(self, top, left, height, width, before, after):
+        self.top = top
+        self.left = left
+        self.height = height
+        self.width = width
+        self.before = before
+        self.after = after
+
+        sides = [values for values in (before, after) if values is not None]
+        self.cost = (
+            _RECORD_BYTES
+            + len(sides) * height * width * _SLOT_BYTES
+            + _string_bytes(value for values in sides for value in values)
+        )
+
+    def rect(self):
+        return (
+            self.top,
+            self.left,
+            self.top + self.height - 1,
+            self.left + self.width - 1,
+        )
+
+    def values(self, use_new):
+        """Yield ((row, col), value) for every cell the edit changed."""
+        target = self.after if use_new else self.before
+        other = self.before if use_new else self.after
+        for i in range(self.height * self.width):
+            value = target[i] if target is not None else ""
+            if value == (other[i] if other is not None else ""):
+                continue
+            row, col = divmod(i, self.width)
+            yield (self.top + row, self.left + col), value
+
+
+class SparseRecord:
+    """Cell edit stored as a list of ((row, col), old, new)."""
+
+    def __init__(self, changes):
+        self.changes = changes
+        self.cost = (
+            _RECORD_BYTES
+            + len(changes) * _SPARSE_ENTRY_BYTES
+            + _string_bytes(
+                value for _, old_value, new_value in changes
+                for value in (old_value, new_value)
+            )
+        )
+
+    def rect(self):
+        rows = [row for (row, _), _, _ in self.changes]
+        cols = [col for (_, col), _, _ in self.changes]
+        return min(rows), min(cols), max(rows), max(cols)
+
+    def values(self, use_new):
+        for pos, old_value, new_value in self.changes:
+            yield pos, new_value if use_new else old_value
+
+
+class PermutationRecord:
+    """Undo entry for swapping whole rows or columns.
+
+    `axis` is "row" or "column"; `pairs` is the list of (a, b) swaps in
+    the order they were applied. Undoing applies the same swaps in
+    reverse order, so no cell values are kept.
+    """
+
+    def __init__(self, axis, pairs):
+        self.axis = axis
+        self.pairs = list(pairs)
+
+    @property
+    def cost(self):
+        return _RECORD_BYTES + len(self.pairs) * 2 * _SLOT_BYTES
+
+    def inverse(self):
+        return PermutationRecord(self.axis, reversed(self.pairs))
+
+    def apply(self, cells):
+        swap = cells.swap_rows if self.axis == "row" else cells.swap_columns
+        for a, b in self.pairs:
+            swap(a, b)
+
+    def indices(self):
+        """Every row or column index the swaps touch."""
+        touched = set()
+        for a, b in self.pairs:
+            touched.add(a)
+            touched.add(b)
+        return touched
+
+    def to_json(self):
+        return [self.axis, [list(pair) for pair in self.pairs]]
+
+    @staticmethod
+    def from_json(data):
+        axis, pairs = data
+        return PermutationRecord(axis, [tuple(pair) for pair in pairs])
+
+
+def record_from_changes(changes):
+    """Pick the most compact record for a list of ((row, col), old, new)."""
+    if len(changes) < 4:
+        return SparseRecord(changes)
+
+    rows = [row for (row, _), _, _ in changes]
+    cols = [col for (_, col), _, _ in changes]
+    top, left = min(rows), min(cols)
+    height = max(rows) - top + 1
+    width = max(cols) - left + 1
+    if len(changes) < height * width * _MIN_BLOCK_DENSITY:
+        return SparseRecord(changes)
+
+    # cells inside the rectangle that did not change stay "" on both
+    # sides, so values() never reports them
+    before = [""] * (height * width)
+    after = [""] * (height * width)
+    for (row, col), old_value, new_value in changes:
+        i = (row - top) * width + (col - left)
+        before[i] = old_value
+        after[i] = new_value
+    return BlockRecord(
+        top, left, height, width,
+        before if any(before) else None,
+        after if any(after) else None,
+    )
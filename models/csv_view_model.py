@@ -0,0 +1,96 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+
+from models.table_model import column_name
+
+
+class CsvViewModel(QAbstractTableModel):
+    """Read-only model over a MappedCsv.
+
+    Rows appear as the file is indexed. Only the rows the view asks for
+    are parsed; columns are added when a wider row is met.
+    """
+
+    # checked by TableView, which then only allows copying
+    read_only = True
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.rows = source.row_count
+        self.columns = max(1, source.sample_columns)
+        self._columns_wanted = self.columns
+
+        source.rows_indexed.connect(self._on_rows_indexed)
+        source.index_finished.connect(self._on_rows_indexed)
+
+    # ---------- REQUIRED OVERRIDES ----------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.columns
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+
+        if orientation == Qt.Horizontal:
+            return column_name(section)
+
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+
+        values = self.source.row(index.row())
+        if len(values) > self._columns_wanted:
+            # the view is painting; add the columns once it is done
+            if self._columns_wanted == self.columns:
+                QTimer.singleShot(0, self._add_columns)
+            self._columns_wanted = len(values)
+        col = index.column()
+        return values[col] if col < len(values) else ""
+
+    def setData(self, index, value, role=Qt.EditRole):
+        return False
+
+    # ---------- EXTENT ----------
+
+    def used_range(self):
+        if not self.rows:
+            return None
+        return (0, 0, self.rows - 1, self.columns - 1)
+
+    def _on_rows_indexed(self, rows):
+        if rows <= self.rows:
+            return
+        self.beginInsertRows(QModelIndex(), self.rows, rows - 1)
+        self.rows = rows
+        self.endInsertRows()
+
+    def _add_columns(self):
+        if self._columns_wanted <= self.columns:
+            return
+        self.beginInsertColumns(QModelIndex(), self.columns, self._columns_wanted - 1)
+        self.columns = self._columns_wanted
+        self.endInsertColumns()
+
+    # ---------- COPY ----------
+
+    def rows_in_rect(self, top, left, bottom, right):
+        """{row: {col: value}} for the filled rows of a rectangle."""
+        rows = {}
+        for row, values in self.source.iter_rows(top, bottom):
+            cols = {
+                col: value
+                for col, value in enumerate(values[left:right + 1], left)
+                if value
+            }
+            if cols:
+                rows[row] = cols
+        return rows
@@ -1,72 +1,66 @@
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
 
+from models.change_records import PermutationRecord, record_from_changes
+from models.undo_history import UndoHistory
+
+
+def column_name(index):
+    """Spreadsheet letters for a 0-based column: A, B, ..., Z, AA, AB, ..."""
+    name = ""
+    while index >= 0:
+        name = chr(index % 26 + 65) + name
+        index = index // 26 - 1
+    return name
+
 
 class TableModel(QAbstractTableModel):
     save_requested = Signal()
+    cells_changed = Signal(object, object)  # sheet, {(row, col): value}
+    cells_permuted = Signal(object, object)  # sheet, PermutationRecord
     undo_state_changed = Signal(bool, bool)
-    MAX_ROWS = 2000
-    MAX_COLUMNS = 200
 
-    def __init__(self, document):
-        super().__init__()
+    # The grid reports the sheet's used range plus a margin, never less
+    # than MIN_ROWS x MIN_COLUMNS, and grows as the user scrolls, moves or
+    # types near the edge. MAX_* are hard limits (the same as Excel's).
+    MIN_ROWS = 1000
+    MIN_COLUMNS = 52
+    ROW_MARGIN = 200
+    COLUMN_MARGIN = 26
+    FETCH_ROWS = 1000
+    FETCH_COLUMNS = 26
+    MAX_ROWS = 1048576
+    MAX_COLUMNS = 16384
+
+    # approximate bytes of undo records kept per sheet
+    UNDO_BUDGET = UndoHistory.DEFAULT_BUDGET
+
+    def __init__(self, document, sheet=None, history=None, parent=None):
+        """Model for one sheet of `document` (its active sheet by default).
+
+        EditorPage keeps one model per sheet and switches between them;
+        `history` lets a model built for a sheet again pick up the undo
+        history of the one it replaces.
+        """
+        super().__init__(parent)
         self.document = document
+        self.sheet = document.active_sheet if sheet is None else sheet
 
-        self.rows = self.MAX_ROWS
-        self.columns = self.MAX_COLUMNS
+        self.rows, self.columns = self._extent_for_sheet()
 
-        self._undo_stack = []
-        self._redo_stack = []
+        self._history = UndoHistory(self.UNDO_BUDGET) if history is None else history
         self._suspend_history = False
 
+        # see write_typed_text
+        self._typing_session = None
+        self._typing_record = None
+
         self._compound_depth = 0
         self._compound_before = {}
         self._compound_after = {}
 
-        self._history_by_sheet = {}
-        self._history_sheet_key = None
-        self._ensure_history_for_active_sheet()
-
-    def _active_sheet_history_key(self):
-        return id(self.document.active_sheet)
-
-    def _save_history_state(self, key):
-        self._history_by_sheet[key] = {
-            "undo_stack": self._undo_stack,
-            "redo_stack": self._redo_stack,
-            "compound_depth": self._compound_depth,
-            "compound_before": self._compound_before,
-            "compound_after": self._compound_after,
-            "suspend_history": self._suspend_history,
-        }
-
-    def _ensure_history_for_active_sheet(self):
-        key = self._active_sheet_history_key()
-        if self._history_sheet_key == key:
-            return
-
-        if self._history_sheet_key is not None:
-            self._save_history_state(self._history_sheet_key)
-
-        state = self._history_by_sheet.get(key)
-        if state is None:
-            state = {
-                "undo_stack": [],
-                "redo_stack": [],
-                "compound_depth": 0,
-                "compound_before": {},
-                "compound_after": {},
-                "suspend_history": False,
-            }
-            self._history_by_sheet[key] = state
-
-        self._undo_stack = state["undo_stack"]
-        self._redo_stack = state["redo_stack"]
-        self._compound_depth = state["compound_depth"]
-        self._compound_before = state["compound_before"]
-        self._compound_after = state["compound_after"]
-        self._suspend_history = state["suspend_history"]
-        self._history_sheet_key = key
-        self._emit_undo_state()
+    @property
+    def history(self):
+        return self._history
 
     # ---------- REQUIRED OVERRIDES ----------
 
@@ -76,6 +70,51 @@ class TableModel(QAbstractTableModel):
     def columnCount(self, parent=QModelIndex()):
         return self.columns
 
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.rows < self.MAX_ROWS
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        self._resize(self.rows + self.FETCH_ROWS, self.columns)
+
+    def fetch_more_columns(self):
+        self._resize(self.rows, self.columns + self.FETCH_COLUMNS)
+
+    # ---------- GRID EXTENT ----------
+
+    def used_range(self):
+        return self.sheet.used_range()
+
+    def _extent_for_sheet(self):
+        used = self.used_range()
+        max_row, max_col = used[2:] if used is not None else (-1, -1)
+        return (
+            min(self.MAX_ROWS, max(self.MIN_ROWS, max_row + 1 + self.ROW_MARGIN)),
+            min(self.MAX_COLUMNS, max(self.MIN_COLUMNS, max_col + 1 + self.COLUMN_MARGIN)),
+        )
+
+    def grow_to(self, row, col):
+        """Keep a margin of empty rows/columns past (row, col)."""
+        self._resize(
+            max(self.rows, row + 1 + self.ROW_MARGIN),
+            max(self.columns, col + 1 + self.COLUMN_MARGIN),
+        )
+
+    def _resize(self, rows, columns):
+        rows = min(rows, self.MAX_ROWS)
+        columns = min(columns, self.MAX_COLUMNS)
+
+        if rows > self.rows:
+            self.beginInsertRows(QModelIndex(), self.rows, rows - 1)
+            self.rows = rows
+            self.endInsertRows()
+
+        if columns > self.columns:
+            self.beginInsertColumns(QModelIndex(), self.columns, columns - 1)
+            self.columns = columns
+            self.endInsertColumns()
+
     def flags(self, index):
         return Qt.ItemIsSelectable | Qt.ItemIsEditable | Qt.ItemIsEnabled
 
@@ -86,32 +125,24 @@ class TableModel(QAbstractTableModel):
             return None
 
         if orientation == Qt.Horizontal:
-            return self._column_name(section)
+            return column_name(section)
 
         return str(section + 1)
 
-    def _column_name(self, index):
-        name = ""
-        while index >= 0:
-            name = chr(index % 26 + 65) + name
-            index = index // 26 - 1
-        return name
-
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid():
             return None
 
         if role in (Qt.DisplayRole, Qt.EditRole):
-            return self.document.active_sheet.cells.get((index.row(), index.column()), "")
+            return self.sheet.cells.get((index.row(), index.column()), "")
         return None
 
     def setData(self, index, value, role=Qt.EditRole):
-        self._ensure_history_for_active_sheet()
         if role != Qt.EditRole:
             return False
 
         row, col = index.row(), index.column()
-        cells = self.document.active_sheet.cells
+        cells = self.sheet.cells
         before = cells.get((row, col), "")
         after = "" if value is None else str(value)
 
@@ -121,40 +152,117 @@ class TableModel(QAbstractTableModel):
         if after == "":
             cells.pop((row, col), None)
         else:
-            cells[(row, col)] = after
+            cells[(row, col)] = self.document.strings.intern(after)
 
         final_value = cells.get((row, col), "")
         self._push_change({(row, col): before}, {(row, col): final_value})
         self.dataChanged.emit(index, index)
-        self.save_requested.emit()
+        self.grow_to(row, col)
+        self._request_save({(row, col): final_value})
         return True
 
-    def set_cells_batch(self, changes):
-        if not changes:
+    def write_typed_text(self, row, col, text, session):
+        """Write live-typed text; writes sharing `session` are one undo entry.
+
+        The caller starts a new session for every cell visit. Typing that
+        ends up back at the original value removes the entry altogether.
+        """
+        cells = self.sheet.cells
+        before = cells.get((row, col), "")
+        after = "" if text is None else str(text)
+        if after == before:
             return False
 
-        cells = self.document.active_sheet.cells
-        min_row = min(r for r, _ in changes.keys())
-        max_row = max(r for r, _ in changes.keys())
-        min_col = min(c for _, c in changes.keys())
-        max_col = max(c for _, c in changes.keys())
+        if after == "":
+            cells.pop((row, col), None)
+        else:
+            after = self.document.strings.intern(after)
+            cells[(row, col)] = after
+
+        record = self._history.peek_undo()
+        if (
+            session == self._typing_session
+            and record is not None
+            and record is self._typing_record
+            and record.changes[0][0] == (row, col)
+            and not self._history.can_redo
+            and self._compound_depth == 0
+        ):
+            pos, original, _ = record.changes[0]
+            if after == original:
+                self._history.drop_undo()
+                self._typing_record = None
+            else:
+                record.changes[0] = (pos, original, after)
+            self._emit_undo_state()
+        else:
+            self._push_change({(row, col): before}, {(row, col): after})
+            self._typing_session = session
+            merge_later = self._compound_depth == 0 and not self._suspend_history
+            self._typing_record = self._history.peek_undo() if merge_later else None
+
+        self.grow_to(row, col)
+        index = self.index(row, col)
+        self.dataChanged.emit(index, index)
+        self._request_save({(row, col): after})
+        return True
 
+    def write_cells(self, changes):
+        """Write {(row, col): value} as one edit.
+
+        Applies every value in one pass, then records one undo entry,
+        emits one dataChanged for the bounding rectangle and requests one
+        save. Returns True if any cell changed.
+        """
+        cells = self.sheet.cells
+        intern = self.document.strings.intern
+
+        before = {}
+        after = {}
         for (row, col), value in changes.items():
+            if row >= self.MAX_ROWS or col >= self.MAX_COLUMNS:
+                continue
+            value = "" if value is None else str(value)
+            previous = cells.get((row, col), "")
+            if value == previous:
+                continue
+
             if value == "":
                 cells.pop((row, col), None)
             else:
+                value = intern(value)
                 cells[(row, col)] = value
+            before[(row, col)] = previous
+            after[(row, col)] = value
 
+        if not after:
+            return False
+
+        min_row = min(r for r, _ in after)
+        max_row = max(r for r, _ in after)
+        min_col = min(c for _, c in after)
+        max_col = max(c for _, c in after)
+
+        self._push_change(before, after)
+        self.grow_to(max_row, max_col)
         self.dataChanged.emit(self.index(min_row, min_col), self.index(max_row, max_col))
-        self.save_requested.emit()
+        self._request_save(after)
         return True
 
+    def write_block(self, top, left, block):
+        """Write a list of rows of values with its first cell at (top, left)."""
+        changes = {}
+        for r, values in enumerate(block, top):
+            for c, value in enumerate(values, left):
+                changes[(r, c)] = value
+        return self.write_cells(changes)
+
     def clear_cells(self, positions):
         unique_positions = list(dict.fromkeys(positions))
         if not unique_positions:
             return False
 
-        cells = self.document.active_sheet.cells
+        cells = self.sheet.cells
         before = {}
         after = {}
         rows = []
@@ -176,12 +284,25 @@ class TableModel(QAbstractTableModel):
 
         self._push_change(before, after)
         self.dataChanged.emit(self.index(min(rows), min(cols)), self.index(max(rows), max(cols)))
-        self.save_requested.emit()
+        self._request_save(after)
         return True
 
+    def cells_in_rect(self, top, left, bottom, right):
+        """[((row, col), value), ...] for the filled cells of a rectangle."""
+        return list(self.sheet.cells.items_in(top, left, bottom, right))
+
+    def rows_in_rect(self, top, left, bottom, right):
+        """{row: {col: value}} for the filled rows of a rectangle."""
+        return dict(self.sheet.cells.rows_in(top, left, bottom, right))
+
+    def clear_rect(self, top, left, bottom, right):
+        """Empty every cell of a rectangle as one edit."""
+        filled = self.cells_in_rect(top, left, bottom, right)
+        return self.write_cells({pos: "" for pos, _ in filled})
+
     @property
     def cells(self):
-        return self.document.active_sheet.cells
+        return self.sheet.cells
 
     def swap_cells(self, r1, c1, r2, c2):
         positions = [(r1, c1), (r2, c2)]
@@ -208,66 +329,20 @@ class TableModel(QAbstractTableModel):
             self.index(min(r1, r2), min(c1, c2)),
             self.index(max(r1, r2), max(c1, c2)),
         )
-        self.save_requested.emit()
+        self._request_save(after)
 
     def swap_rows(self, r1, r2):
         if r1 == r2:
             return
-
-        cells = self.cells
-        cols = set(c for (_, c) in cells.keys())
-        positions = [(r1, c) for c in cols] + [(r2, c) for c in cols]
-        before = self._snapshot_positions(positions)
-
-        for c in cols:
-            v1 = cells.get((r1, c), "")
-            v2 = cells.get((r2, c), "")
-
-            if v1:
-                cells[(r2, c)] = v1
-            else:
-                cells.pop((r2, c), None)
-
-            if v2:
-                cells[(r1, c)] = v2
-            else:
-                cells.pop((r1, c), None)
-
-        after = self._snapshot_positions(positions)
-        self._push_change(before, after)
-        self.layoutChanged.emit()
-        self.save_requested.emit()
+        self._push_permutation(PermutationRecord("row", [(r1, r2)]))
 
     def swap_columns(self, c1, c2):
         if c1 == c2:
             return
-
-        cells = self.cells
-        rows = set(r for (r, _) in cells.keys())
-        positions = [(r, c1) for r in rows] + [(r, c2) for r in rows]
-        before = self._snapshot_positions(positions)
-
-        for r in rows:
-            v1 = cells.get((r, c1), "")
-            v2 = cells.get((r, c2), "")
-
-            if v1:
-                cells[(r, c2)] = v1
-            else:
-                cells.pop((r, c2), None)
-
-            if v2:
-                cells[(r, c1)] = v2
-            else:
-                cells.pop((r, c1), None)
-
-        after = self._snapshot_positions(positions)
-        self._push_change(before, after)
-        self.layoutChanged.emit()
-        self.save_requested.emit()
+        self._push_permutation(PermutationRecord("column", [(c1, c2)]))
 
     def swap_block(self, r1, c1, r2, c2, dr1, dc1, dr2, dc2):
-        cells = self.document.active_sheet.cells
+        cells = self.sheet.cells
 
         src_h = r2 - r1
         src_w = c2 - c1
@@ -275,6 +350,18 @@ class TableModel(QAbstractTableModel):
         if (dr2 - dr1) != src_h or (dc2 - dc1) != src_w:
             return
 
+        # whole rows or whole columns that do not overlap are a permutation
+        if c1 == dc1 == 0 and c2 == self.columns - 1 and (r2 < dr1 or dr2 < r1):
+            self._push_permutation(PermutationRecord(
+                "row", [(r1 + i, dr1 + i) for i in range(src_h + 1)]
+            ))
+            return
+        if r1 == dr1 == 0 and r2 == self.rows - 1 and (c2 < dc1 or dc2 < c1):
+            self._push_permutation(PermutationRecord(
+                "column", [(c1 + i, dc1 + i) for i in range(src_w + 1)]
+            ))
+            return
+
         before = {}
         for r in range(src_h + 1):
             for c in range(src_w + 1):
@@ -308,17 +395,15 @@ class TableModel(QAbstractTableModel):
 
         self._push_change(before, after)
         self.layoutChanged.emit()
-        self.save_requested.emit()
+        self._request_save(after)
 
     def begin_compound_action(self):
-        self._ensure_history_for_active_sheet()
         self._compound_depth += 1
         if self._compound_depth == 1:
             self._compound_before = {}
             self._compound_after = {}
 
     def end_compound_action(self):
-        self._ensure_history_for_active_sheet()
         if self._compound_depth == 0:
             return
 
@@ -340,32 +425,32 @@ class TableModel(QAbstractTableModel):
         self.end_compound_action()
 
     def undo(self):
-        self._ensure_history_for_active_sheet()
-        if not self._undo_stack:
+        if not self._history.can_undo:
             return
 
-        changes = self._undo_stack.pop()
-        self._apply_changes(changes, use_new=False)
-        self._redo_stack.append(changes)
+        record = self._history.pop_undo()
+        if isinstance(record, PermutationRecord):
+            self._apply_permutation(record.inverse())
+        else:
+            self._apply_changes(record, use_new=False)
         self._emit_undo_state()
 
     def redo(self):
-        self._ensure_history_for_active_sheet()
-        if not self._redo_stack:
+        if not self._history.can_redo:
             return
 
-        changes = self._redo_stack.pop()
-        self._apply_changes(changes, use_new=True)
-        self._undo_stack.append(changes)
+        record = self._history.pop_redo()
+        if isinstance(record, PermutationRecord):
+            self._apply_permutation(record)
+        else:
+            self._apply_changes(record, use_new=True)
         self._emit_undo_state()
 
     def can_undo(self):
-        self._ensure_history_for_active_sheet()
-        return bool(self._undo_stack)
+        return self._history.can_undo
 
     def can_redo(self):
-        self._ensure_history_for_active_sheet()
-        return bool(self._redo_stack)
+        return self._history.can_redo
 
     def _snapshot_positions(self, positions):
         snapshot = {}
@@ -386,7 +471,6 @@ class TableModel(QAbstractTableModel):
         return changes
 
     def _record_action(self, changes):
-        self._ensure_history_for_active_sheet()
         if self._suspend_history:
             return
         normalized = []
@@ -400,7 +484,6 @@ class TableModel(QAbstractTableModel):
             self._push_action(normalized)
 
     def _push_change(self, before, after):
-        self._ensure_history_for_active_sheet()
         if self._suspend_history:
             return
 
@@ -418,38 +501,70 @@ class TableModel(QAbstractTableModel):
         self._push_action(changes)
 
     def _push_action(self, changes):
+        """Push a list of ((row, col), old, new) or a ready-made record."""
         if not changes:
             return
-        self._undo_stack.append(changes)
-        self._redo_stack.clear()
+        if isinstance(changes, list):
+            changes = record_from_changes(changes)
+        self._history.push(changes)
         self._emit_undo_state()
 
+    def _push_permutation(self, record):
+        self._apply_permutation(record)
+        if not self._suspend_history:
+            self._push_action(record)
+
+    def _apply_permutation(self, record):
+        record.apply(self.cells)
+
+        # only the moved rows or columns change on screen
+        for first, last in _runs(record.indices()):
+            if record.axis == "row":
+                self.dataChanged.emit(self.index(first, 0), self.index(last, self.columns - 1))
+            else:
+                self.dataChanged.emit(self.index(0, first), self.index(self.rows - 1, last))
+
+        self.cells_permuted.emit(self.sheet, record)
+        self.save_requested.emit()
+
+    def _request_save(self, written):
+        if written:
+            self.cells_changed.emit(self.sheet, written)
+        self.save_requested.emit()
+
     def _emit_undo_state(self):
-        self.undo_state_changed.emit(bool(self._undo_stack), bool(self._redo_stack))
+        self.undo_state_changed.emit(self._history.can_undo, self._history.can_redo)
 
-    def _apply_changes(self, changes, use_new):
-        cells = self.document.active_sheet.cells
+    def _apply_changes(self, record, use_new):
+        cells = self.sheet.cells
         self._suspend_history = True
 
-        rows = []
-        cols = []
-        for (row, col), old_value, new_value in changes:
-            value = new_value if use_new else old_value
+        written = {}
+        for pos, value in record.values(use_new):
             if value == "":
-                cells.pop((row, col), None)
+                cells.pop(pos, None)
             else:
-                cells[(row, col)] = value
-            rows.append(row)
-            cols.append(col)
+                cells[pos] = value
+            written[pos] = value
 
         self._suspend_history = False
 
-        if rows and cols:
-            self.dataChanged.emit(
-                self.index(min(rows), min(cols)),
-                self.index(max(rows), max(cols)),
-            )
+        if written:
+            top, left, bottom, right = record.rect()
+            self.grow_to(bottom, right)
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right))
         else:
             self.layoutChanged.emit()
 
-        self.save_requested.emit()
+        self._request_save(written)
+
+
+def _runs(indices):
+    """Group indices into (first, last) runs of consecutive values."""
+    runs = []
+    for i in sorted(indices):
+        if runs and runs[-1][1] == i - 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return runs
@@ -0,0 +1,65 @@
+from collections import deque
+
+
+class UndoHistory:
+    """Undo and redo stacks of change records with a memory budget.
+
+    Records are weighed by their approximate `cost`. When the undo stack
+    goes over `budget` bytes, the oldest entries are dropped, but the most
+    recent one is always kept, even if it alone is over the budget.
+    """
+
+    DEFAULT_BUDGET = 32 * 1024 * 1024
+
+    def __init__(self, budget=None):
+        self.budget = self.DEFAULT_BUDGET if budget is None else budget
+        self._undo = deque()
+        self._redo = []
+        self._undo_cost = 0
+
+    def __bool__(self):
+        return bool(self._undo or self._redo)
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def push(self, record):
+        """Record a new edit; clears the redo stack."""
+        self._redo.clear()
+        self._append_undo(record)
+
+    def pop_undo(self):
+        """Take the newest edit for undoing and move it to the redo stack."""
+        record = self._undo.pop()
+        self._undo_cost -= record.cost
+        self._redo.append(record)
+        return record
+
+    def pop_redo(self):
+        """Take the last undone edit for redoing and move it back."""
+        record = self._redo.pop()
+        self._append_undo(record)
+        return record
+
+    def peek_undo(self):
+        return self._undo[-1] if self._undo else None
+
+    def drop_undo(self):
+        """Discard the newest edit without moving it to the redo stack."""
+        self._undo_cost -= self._undo.pop().cost
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._undo_cost = 0
+
+    def _append_undo(self, record):
+        self._undo.append(record)
+        self._undo_cost += record.cost
+        while self._undo_cost > self.budget and len(self._undo) > 1:
+            self._undo_cost -= self._undo.popleft().cost
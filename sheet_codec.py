@@ -0,0 +1,153 @@
+"""Compact binary encoding of a single sheet.
+
+Layout (little-endian):
+
+    magic     4s   b"XLSH"
+    version   H
+    seq       Q    journal sequence the snapshot was taken at
+    id, name       u32 byte length + UTF-8
+    strings   I    count, then `count` u32 character lengths and the
+                   concatenated UTF-8 text of the shared-string table
+    cells     I    count, then rows[u32], cols[u32] and string indices[u32]
+    heights   I    count, then rows[u32] and heights[i32]
+    widths    I    count, then cols[u32] and widths[i32]
+
+Lengths in the string table count characters, not bytes, so the whole
+table is decoded with a single `bytes.decode` and sliced.
+"""
+
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from operator import itemgetter
+
+from cell_store import CellStore
+
+MAGIC = b"XLSH"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHQ")
+_COUNT = struct.Struct("<I")
+
+
+class SheetCodecError(ValueError):
+    pass
+
+
+def _le(arr):
+    # array() uses native byte order; the file is always little-endian
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def _pack_text(out, text):
+    raw = text.encode("utf-8", "surrogatepass")
+    out.append(_COUNT.pack(len(raw)))
+    out.append(raw)
+
+
+def _pack_sizes(out, sizes):
+    out.append(_COUNT.pack(len(sizes)))
+    out.append(_le(array("I", sizes.keys())).tobytes())
+    out.append(_le(array("i", sizes.values())).tobytes())
+
+
+def encode_sheet(sheet, seq=0):
+    """Encode a Sheet's id, name, cells and header sizes."""
+    cells = sheet.cells
+    positions = list(cells.keys())
+    values = list(cells.values())
+    # dict.fromkeys keeps first-seen order, which gives the table order
+    index_of = {value: i for i, value in enumerate(dict.fromkeys(values))}
+    strings = list(index_of)
+    rows = array("I", map(itemgetter(0), positions))
+    cols = array("I", map(itemgetter(1), positions))
+    refs = array("I", map(index_of.__getitem__, values))
+
+    out = [_HEADER.pack(MAGIC, VERSION, seq)]
+    _pack_text(out, sheet.id)
+    _pack_text(out, sheet.name)
+
+    out.append(_COUNT.pack(len(strings)))
+    out.append(_le(array("I", map(len, strings))).tobytes())
+    _pack_text(out, "".join(strings))
+
+    out.append(_COUNT.pack(len(refs)))
+    out.append(_le(rows).tobytes())
+    out.append(_le(cols).tobytes())
+    out.append(_le(refs).tobytes())
+
+    _pack_sizes(out, sheet.row_heights)
+    _pack_sizes(out, sheet.col_widths)
+    return b"".join(out)
+
+
+class _Reader:
+    def __init__(self, blob):
+        self.view = memoryview(blob)
+        self.pos = 0
+
+    def take(self, size):
+        if self.pos + size > len(self.view):
+            raise SheetCodecError("truncated sheet data")
+        chunk = self.view[self.pos:self.pos + size]
+        self.pos += size
+        return chunk
+
+    def count(self):
+        return _COUNT.unpack(self.take(_COUNT.size))[0]
+
+    def text(self):
+        return bytes(self.take(self.count())).decode("utf-8", "surrogatepass")
+
+    def array(self, typecode, count):
+        arr = array(typecode)
+        arr.frombytes(self.take(count * arr.itemsize))
+        return _le(arr)
+
+
+def _unpack_sizes(reader):
+    count = reader.count()
+    keys = reader.array("I", count)
+    values = reader.array("i", count)
+    return dict(zip(keys, values))
+
+
+def decode_sheet(blob, intern=None):
+    """Decode into {"id", "name", "seq", "cells", "row_heights", "col_widths"}.
+
+    `intern`, if given, is applied once to each entry of the string table.
+    """
+    reader = _Reader(blob)
+    magic, version, seq = _HEADER.unpack(reader.take(_HEADER.size))
+    if magic != MAGIC:
+        raise SheetCodecError("not an Excelify sheet file")
+    if version > VERSION:
+        raise SheetCodecError(f"unsupported sheet format version {version}")
+
+    sheet_id = reader.text()
+    name = reader.text()
+
+    lengths = reader.array("I", reader.count())
+    text = reader.text()
+    offsets = list(accumulate(lengths, initial=0))
+    strings = list(map(text.__getitem__, map(slice, offsets, offsets[1:])))
+    if intern is not None:
+        strings = list(map(intern, strings))
+
+    count = reader.count()
+    rows = reader.array("I", count)
+    cols = reader.array("I", count)
+    refs = reader.array("I", count)
+    cells = CellStore(zip(zip(rows, cols), map(strings.__getitem__, refs)))
+
+    return {
+        "id": sheet_id,
+        "name": name,
+        "seq": seq,
+        "cells": cells,
+        "row_heights": _unpack_sizes(reader),
+        "col_widths": _unpack_sizes(reader),
+    }
@@ -0,0 +1,320 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from cell_store import CellStore
+from document import Document
+from storage import DATA_DIR, WorkspaceStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    active_sheet_index INTEGER NOT NULL,
+    content TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS sheets (
+    id TEXT PRIMARY KEY,
+    document TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    row_heights TEXT NOT NULL DEFAULT '{}',
+    col_widths TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS cells (
+    document TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (sheet, row, col)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cells_by_col ON cells (sheet, col);
+"""
+# PRAGMA user_version once the JSON workspace has been taken over
+MIGRATED_VERSION = 1
+
+
+def _sheet_meta_row(sheet, position):
+    """(id, position, name, row_heights, col_widths) for the sheets table.
+
+    Renames and resizes reach the database through this, with the
+    document metadata; the sheet's cells are not rewritten for them.
+    """
+    meta = sheet.to_meta()
+    sizes = [
+        json.dumps(meta[key]) if key in meta else None
+        for key in ("row_heights", "col_widths")
+    ]
+    return (sheet.id, position, sheet.name, *sizes)
+
+
+class SqliteWorkspaceStore:
+    """Workspace kept in one SQLite database (data/workspace.sqlite3).
+
+    Same interface as storage.WorkspaceStore. Cell edits are applied as
+    one transaction per committed change instead of a journal line, and
+    sheets load their cells from the database the first time they are
+    opened. The primary key (sheet, row, col) doubles as the (sheet, row)
+    index; a second index covers (sheet, col).
+
+    The GUI thread reads through its own connection; all writes go
+    through a connection owned by the autosave worker. WAL mode lets the
+    two run side by side.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else DATA_DIR
+        self.db_file = self.root / "workspace.sqlite3"
+        self._structure = {}
+        self._migrated = False
+        self._reader = None
+        self._local = threading.local()
+
+    def _connect(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _reader_conn(self):
+        if self._reader is None:
+            self._reader = self._connect()
+        return self._reader
+
+    def _writer_conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # ---------- LOADING ----------
+
+    def load(self):
+        conn = self._reader_conn()
+        rows = conn.execute(
+            "SELECT id, name, type, active_sheet_index"
+            " FROM documents ORDER BY position"
+        ).fetchall()
+
+        self._migrated = conn.execute("PRAGMA user_version").fetchone()[0] >= MIGRATED_VERSION
+        if not rows and not self._migrated:
+            # first run on this backend: take over the JSON workspace. It
+            # counts as done once the first save commits, so deleting every
+            # document later does not bring the JSON ones back
+            documents = WorkspaceStore(self.root).load()
+            for doc in documents:
+                doc.mark_dirty()
+            return documents
+
+        sheets_by_doc = {}
+        for sheet_id, doc_id, name, row_heights, col_widths in conn.execute(
+            "SELECT id, document, name, row_heights, col_widths"
+            " FROM sheets ORDER BY position"
+        ):
+            sheets_by_doc.setdefault(doc_id, []).append({
+                "id": sheet_id,
+                "name": name,
+                "row_heights": json.loads(row_heights),
+                "col_widths": json.loads(col_widths),
+            })
+
+        documents = []
+        for doc_id, name, doc_type, active_index in rows:
+            meta = {
+                "id": doc_id,
+                "name": name,
+                "type": doc_type,
+                "active_sheet_index": active_index,
+                "sheets": sheets_by_doc.get(doc_id, []),
+            }
+            documents.append(
+                Document.from_meta(meta, self._load_sheet, self._load_content)
+            )
+            self._structure[doc_id] = [s["id"] for s in meta["sheets"]]
+        return documents
+
+    def _load_sheet(self, doc_id, sheet_meta):
+        cursor = self._reader_conn().execute(
+            "SELECT row, col, value FROM cells WHERE sheet = ?",
+            (sheet_meta["id"],),
+        )
+        return {
+            "cells": CellStore(((r, c), value) for r, c, value in cursor),
+            "row_heights": {int(r): h for r, h in sheet_meta["row_heights"].items()},
+            "col_widths": {int(c): w for c, w in sheet_meta["col_widths"].items()},
+        }
+
+    def _load_content(self, doc_id):
+        row = self._reader_conn().execute(
+            "SELECT content FROM documents WHERE id = ?", (doc_id,)
+        ).fetchone()
+        return row[0] if row else ""
+
+    # ---------- CELL EDITS ----------
+
+    def record(self, document, sheet, written):
+        return "cells", document.id, sheet.id, [
+            (r, c, value) for (r, c), value in written.items()
+        ]
+
+    def record_permutation(self, document, sheet, permutation):
+        return "permute", document.id, sheet.id, permutation.axis, permutation.pairs
+
+    def append_journal(self, entry):
+        conn = self._writer_conn()
+        with conn:
+            if entry[0] == "permute":
+                self._permute(conn, *entry[1:])
+                return
+
+            _, doc_id, sheet_id, writes = entry
+            conn.executemany(
+                "DELETE FROM cells WHERE sheet = ? AND row = ? AND col = ?",
+                [(sheet_id, r, c) for r, c, value in writes if value == ""],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO cells (document, sheet, row, col, value)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(doc_id, sheet_id, r, c, value) for r, c, value in writes if value != ""],
+            )
+
+    def _permute(self, conn, doc_id, sheet_id, axis, pairs):
+        # rows and columns are never negative, so -1 is free as a
+        # parking spot while the two lines trade places
+        column = "row" if axis == "row" else "col"
+        move = f"UPDATE cells SET {column} = ? WHERE sheet = ? AND {column} = ?"
+        for a, b in pairs:
+            conn.execute(move, (-1, sheet_id, a))
+            conn.execute(move, (a, sheet_id, b))
+            conn.execute(move, (b, sheet_id, -1))
+
+    # ---------- SAVING ----------
+
+    def collect(self, documents, compact=False):
+        structure = {
+            doc.id: [sheet.id for sheet in doc.sheets] for doc in documents
+        }
+        changes = {
+            "documents": None,
+            "sheets": [],
+            "contents": [],
+            "removed_documents": [],
+            "checkpoint": compact,
+        }
+
+        index_dirty = structure != self._structure
+        for doc in documents:
+            if doc.dirty:
+                index_dirty = True
+                if doc.type == "doc":
+                    changes["contents"].append((doc.content, doc.id))
+                doc.dirty = False
+
+            for position, sheet in enumerate(doc.sheets):
+                if not sheet.dirty:
+                    continue
+                # a dirty sheet is written in full; one that was never
+                # opened (taken over from JSON) is loaded for that here
+                row = (
+                    sheet.id,
+                    doc.id,
+                    position,
+                    sheet.name,
+                    json.dumps({str(r): h for r, h in sheet.row_heights.items()}),
+                    json.dumps({str(c): w for c, w in sheet.col_widths.items()}),
+                )
+                cells = [
+                    (doc.id, sheet.id, r, c, value)
+                    for (r, c), value in sheet.cells.items()
+                ]
+                changes["sheets"].append((row, cells))
+                sheet.dirty = False
+
+        if index_dirty:
+            changes["documents"] = [
+                (
+                    doc.id,
+                    position,
+                    doc.name,
+                    doc.type,
+                    doc.active_sheet_index,
+                    [_sheet_meta_row(sheet, i) for i, sheet in enumerate(doc.sheets)],
+                )
+                for position, doc in enumerate(documents)
+            ]
+            changes["removed_documents"] = [
+                doc_id for doc_id in self._structure if doc_id not in structure
+            ]
+            self._structure = structure
+
+        return changes
+
+    def write(self, changes):
+        conn = self._writer_conn()
+        with conn:
+            for row, cells in changes["sheets"]:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sheets"
+                    " (id, document, position, name, row_heights, col_widths)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+                conn.execute("DELETE FROM cells WHERE sheet = ?", (row[0],))
+                conn.executemany(
+                    "INSERT INTO cells (document, sheet, row, col, value)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    cells,
+                )
+
+            if changes["documents"] is not None:
+                for doc_id, position, name, doc_type, active, sheets in changes["documents"]:
+                    conn.execute(
+                        "INSERT INTO documents (id, position, name, type, active_sheet_index)"
+                        " VALUES (?, ?, ?, ?, ?)"
+                        " ON CONFLICT (id) DO UPDATE SET position = excluded.position,"
+                        " name = excluded.name, type = excluded.type,"
+                        " active_sheet_index = excluded.active_sheet_index",
+                        (doc_id, position, name, doc_type, active),
+                    )
+                    # NULL sizes: not known yet, keep what is stored
+                    conn.executemany(
+                        "UPDATE sheets SET position = ?, name = ?,"
+                        " row_heights = COALESCE(?, row_heights),"
+                        " col_widths = COALESCE(?, col_widths) WHERE id = ?",
+                        [(i, name, heights, widths, sheet_id)
+                         for sheet_id, i, name, heights, widths in sheets],
+                    )
+                    alive = [sheet[0] for sheet in sheets]
+                    placeholders = ",".join("?" * len(alive))
+                    stale = conn.execute(
+                        f"SELECT id FROM sheets WHERE document = ? AND id NOT IN ({placeholders})",
+                        [doc_id, *alive],
+                    ).fetchall()
+                    for (sheet_id,) in stale:
+                        conn.execute("DELETE FROM cells WHERE sheet = ?", (sheet_id,))
+                        conn.execute("DELETE FROM sheets WHERE id = ?", (sheet_id,))
+
+                for doc_id in changes["removed_documents"]:
+                    sheet_ids = conn.execute(
+                        "SELECT id FROM sheets WHERE document = ?", (doc_id,)
+                    ).fetchall()
+                    conn.executemany("DELETE FROM cells WHERE sheet = ?", sheet_ids)
+                    conn.execute("DELETE FROM sheets WHERE document = ?", (doc_id,))
+                    conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+            conn.executemany(
+                "UPDATE documents SET content = ? WHERE id = ?", changes["contents"]
+            )
+            if not self._migrated:
+                conn.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+        self._migrated = True
+
+        if changes["checkpoint"]:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
@@ -1,19 +1,347 @@
 import json
+import os
+import shutil
+import time
 from pathlib import Path
 
+from document import Document, Sheet
+from models.change_records import PermutationRecord
+from sheet_codec import decode_sheet, encode_sheet
+
 DATA_DIR = Path(__file__).parent / "data"
-STATE_FILE = DATA_DIR / "app_state.json"
+STATE_FILE = DATA_DIR / "app_state.json"  # legacy single-file layout
+
+STORAGE_VERSION = 2
+
+# "json" (index + per-sheet files + journal) or "sqlite"
+STORAGE_BACKEND = os.environ.get("EXCELIFY_STORAGE", "json")
+
+# on-disk format of sheet files in the JSON backend: "json" or "binary"
+SHEET_FORMAT = os.environ.get("EXCELIFY_SHEET_FORMAT", "json")
+SHEET_SUFFIXES = {"json": ".json", "binary": ".xsheet"}
+
 
 def ensure_storage():
     DATA_DIR.mkdir(exist_ok=True)
 
-def save_state(state: dict):
-    ensure_storage()
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+
+def _write_json(path, data, indent=None):
+    # write to a sibling file and swap it in so a crash mid-write
+    # never leaves a truncated file behind
+    tmp_file = path.with_name(path.name + ".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        if indent is None:
+            json.dump(data, f, separators=(",", ":"))
+        else:
+            json.dump(data, f, indent=indent)
+    os.replace(tmp_file, path)
+
+
+def _write_bytes(path, data):
+    tmp_file = path.with_name(path.name + ".tmp")
+    with open(tmp_file, "wb") as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 
 def load_state():
+    """Read the legacy app_state.json, if present."""
     if not STATE_FILE.exists():
         return None
-    with open(STATE_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _read_json(STATE_FILE)
+
+
+class WorkspaceStore:
+    """Index file plus one folder per document and one file per sheet.
+
+    data/
+      index.json                      document and sheet metadata,
+                                      including sheet names and sizes
+      documents/<doc_id>/<sheet_id>.json    (or .xsheet, see sheet_codec)
+      documents/<doc_id>/content.json  text of "doc" documents
+      journal.jsonl                   cell edits since the last compaction
+
+    Cell edits are appended to the journal as one line each; sheet files
+    are rewritten when the sheet itself is dirty or during a compaction.
+    Every journal record has a sequence number and every sheet file stores
+    the sequence it was snapshotted at, so replay skips what a snapshot
+    already contains.
+
+    `collect` and `record` run on the GUI thread; `write` and
+    `append_journal` run on the autosave worker.
+    """
+
+    JOURNAL_LIMIT = 4 * 1024 * 1024  # bytes of journal before compacting
+    COMPACT_INTERVAL = 120  # seconds between compactions while editing
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else DATA_DIR
+        self.index_file = self.root / "index.json"
+        self.documents_dir = self.root / "documents"
+        self.journal_file = self.root / "journal.jsonl"
+        self._structure = {}  # {doc_id: [sheet_id, ...]} as last scheduled
+
+        self._seq = 0
+        self._journal_bytes = 0
+        self._journaled = set()  # (doc_id, sheet_id) not compacted yet
+        self._last_compaction = time.monotonic()
+        self._journal_handle = None  # owned by the worker thread
+        self._pending_records = {}  # journal records for sheets not loaded yet
+
+    def _document_dir(self, doc_id):
+        return self.documents_dir / doc_id
+
+    def _sheet_file(self, doc_id, sheet_id, sheet_format=None):
+        suffix = SHEET_SUFFIXES[sheet_format or SHEET_FORMAT]
+        return self._document_dir(doc_id) / f"{sheet_id}{suffix}"
+
+    def _read_sheet(self, doc_id, sheet_id):
+        # prefer the configured format, but read files written in the other
+        # one so switching SHEET_FORMAT needs no migration step
+        formats = [SHEET_FORMAT] + [f for f in SHEET_SUFFIXES if f != SHEET_FORMAT]
+        for sheet_format in formats:
+            path = self._sheet_file(doc_id, sheet_id, sheet_format)
+            if not path.exists():
+                continue
+            if sheet_format == "binary":
+                return decode_sheet(path.read_bytes())
+            data = _read_json(path)
+            sheet = Sheet.from_dict(data)
+            return {
+                "seq": data.get("seq", 0),
+                "cells": sheet.cells,
+                "row_heights": sheet.row_heights,
+                "col_widths": sheet.col_widths,
+            }
+        return {"seq": 0, "cells": {}, "row_heights": {}, "col_widths": {}}
+
+    def _content_file(self, doc_id):
+        return self._document_dir(doc_id) / "content.json"
+
+    # ---------- LOADING ----------
+
+    def load(self):
+        """Return the saved documents, or an empty list.
+
+        Falls back to the legacy app_state.json; documents migrated from it
+        are marked dirty so the first save writes them in this layout.
+        """
+        if not self.index_file.exists():
+            legacy = load_state()
+            if legacy is None:
+                return []
+            documents = []
+            for data in legacy.get("documents", []):
+                doc = Document.from_dict(data)
+                doc.mark_dirty()
+                documents.append(doc)
+            return documents
+
+        index = _read_json(self.index_file)
+        self._seq = index.get("seq", 0)
+        self._read_journal()
+
+        # only metadata here; sheet files and contents are read when a
+        # sheet or document is first opened
+        documents = []
+        for meta in index.get("documents", []):
+            documents.append(
+                Document.from_meta(meta, self._load_sheet, self._load_content)
+            )
+            self._structure[meta["id"]] = [s["id"] for s in meta.get("sheets", [])]
+        return documents
+
+    def _load_sheet(self, doc_id, sheet_meta):
+        payload = self._read_sheet(doc_id, sheet_meta["id"])
+        cells = payload["cells"]
+        for record in self._pending_records.pop((doc_id, sheet_meta["id"]), []):
+            if record["n"] <= payload["seq"]:
+                continue
+            if "p" in record:
+                PermutationRecord.from_json(record["p"]).apply(cells)
+                continue
+            for r, c, value in record["c"]:
+                if value == "":
+                    cells.pop((r, c), None)
+                else:
+                    cells[(r, c)] = value
+        return payload
+
+    def _load_content(self, doc_id):
+        content_file = self._content_file(doc_id)
+        if not content_file.exists():
+            return ""
+        return _read_json(content_file).get("content", "")
+
+    def _read_journal(self):
+        """Group journal records by sheet for replay when each sheet loads."""
+        self._pending_records = {}
+        if not self.journal_file.exists():
+            return
+
+        with open(self.journal_file, "r+b") as f:
+            complete = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # torn last line from a crash mid-append; cut it off so
+                    # the next append starts on a line of its own
+                    f.truncate(complete)
+                    break
+                complete += len(line)
+                self._journal_bytes += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+
+                self._seq = max(self._seq, record["n"])
+                key = (record["d"], record["s"])
+                self._pending_records.setdefault(key, []).append(record)
+                self._journaled.add(key)
+
+    # ---------- JOURNAL ----------
+
+    def record(self, document, sheet, written):
+        """Encode committed cell writes as one journal line."""
+        return self._journal_line(
+            document, sheet, "c", [[r, c, value] for (r, c), value in written.items()]
+        )
+
+    def record_permutation(self, document, sheet, permutation):
+        """Encode a whole-row or whole-column swap as one journal line."""
+        return self._journal_line(document, sheet, "p", permutation.to_json())
+
+    def _journal_line(self, document, sheet, kind, payload):
+        self._seq += 1
+        line = json.dumps(
+            {"n": self._seq, "d": document.id, "s": sheet.id, kind: payload},
+            separators=(",", ":"),
+        ) + "\n"
+        self._journal_bytes += len(line)
+        self._journaled.add((document.id, sheet.id))
+        return line
+
+    def append_journal(self, line):
+        if self._journal_handle is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._journal_handle = open(self.journal_file, "a", encoding="utf-8")
+        self._journal_handle.write(line)
+        self._journal_handle.flush()
+
+    def _truncate_journal(self):
+        if self._journal_handle is not None:
+            self._journal_handle.close()
+            self._journal_handle = None
+        if self.journal_file.exists():
+            open(self.journal_file, "w", encoding="utf-8").close()
+
+    def _compaction_due(self):
+        if self._journal_bytes >= self.JOURNAL_LIMIT:
+            return True
+        elapsed = time.monotonic() - self._last_compaction
+        return bool(self._journaled) and elapsed >= self.COMPACT_INTERVAL
+
+    # ---------- SAVING ----------
+
+    def collect(self, documents, compact=False):
+        compact = compact or self._compaction_due()
+        structure = {
+            doc.id: [sheet.id for sheet in doc.sheets] for doc in documents
+        }
+        changes = {
+            "index": None,
+            "sheets": [],
+            "contents": [],
+            "removed_documents": [],
+            "removed_sheets": [],
+            "truncate_journal": compact,
+        }
+
+        # the index carries the sequence counter across truncations
+        index_dirty = compact or structure != self._structure
+        for doc in documents:
+            if doc.dirty:
+                index_dirty = True
+                if doc.type == "doc":
+                    changes["contents"].append((doc.id, doc.content))
+                doc.dirty = False
+
+            for sheet in doc.sheets:
+                key = (doc.id, sheet.id)
+                if sheet.dirty or (compact and key in self._journaled):
+                    changes["sheets"].append((doc.id, sheet.snapshot(), self._seq))
+                    sheet.dirty = False
+                    self._journaled.discard(key)
+
+        if compact:
+            self._journaled.clear()
+            self._journal_bytes = 0
+            self._last_compaction = time.monotonic()
+
+        if index_dirty:
+            changes["index"] = {
+                "version": STORAGE_VERSION,
+                "seq": self._seq,
+                "documents": [doc.to_meta() for doc in documents],
+            }
+            for doc_id, sheet_ids in self._structure.items():
+                if doc_id not in structure:
+                    changes["removed_documents"].append(doc_id)
+                    continue
+                alive = set(structure[doc_id])
+                for sheet_id in sheet_ids:
+                    if sheet_id not in alive:
+                        changes["removed_sheets"].append((doc_id, sheet_id))
+            self._structure = structure
+
+        return changes
+
+    def write(self, changes):
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        for doc_id, sheet, seq in changes["sheets"]:
+            self._document_dir(doc_id).mkdir(parents=True, exist_ok=True)
+            if SHEET_FORMAT == "binary":
+                _write_bytes(self._sheet_file(doc_id, sheet.id), encode_sheet(sheet, seq))
+            else:
+                data = sheet.to_dict()
+                data["seq"] = seq
+                _write_json(self._sheet_file(doc_id, sheet.id), data)
+            for sheet_format in SHEET_SUFFIXES:
+                if sheet_format != SHEET_FORMAT:
+                    stale = self._sheet_file(doc_id, sheet.id, sheet_format)
+                    if stale.exists():
+                        stale.unlink()
+
+        for doc_id, content in changes["contents"]:
+            self._document_dir(doc_id).mkdir(parents=True, exist_ok=True)
+            _write_json(self._content_file(doc_id), {"content": content})
+
+        # the index goes last so it never points at files not written yet
+        if changes["index"] is not None:
+            _write_json(self.index_file, changes["index"], indent=2)
+
+        for doc_id in changes["removed_documents"]:
+            shutil.rmtree(self._document_dir(doc_id), ignore_errors=True)
+
+        for doc_id, sheet_id in changes["removed_sheets"]:
+            for sheet_format in SHEET_SUFFIXES:
+                path = self._sheet_file(doc_id, sheet_id, sheet_format)
+                if path.exists():
+                    path.unlink()
+
+        # every record queued before this write is covered by the snapshots
+        if changes["truncate_journal"]:
+            self._truncate_journal()
+
+
+def open_workspace_store(root=None):
+    if STORAGE_BACKEND == "sqlite":
+        from sqlite_storage import SqliteWorkspaceStore
+        return SqliteWorkspaceStore(root)
+    return WorkspaceStore(root)
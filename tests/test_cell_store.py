@@ -0,0 +1,163 @@
+import random
+
+import pytest
+
+from cell_store import CellStore
+from models.change_records import PermutationRecord
+
+
+def test_mapping_api_matches_a_dict():
+    cells = CellStore({(0, 0): "a", (5, 2): "b"})
+    cells[(5, 3)] = "c"
+    cells[(0, 0)] = "A"
+
+    assert len(cells) == 3
+    assert (5, 2) in cells and (2, 5) not in cells
+    assert cells[(0, 0)] == "A"
+    assert cells.get((9, 9), "") == ""
+    assert cells.pop((5, 2)) == "b"
+    assert cells.pop((5, 2), None) is None
+    with pytest.raises(KeyError):
+        del cells[(5, 2)]
+    assert cells == {(0, 0): "A", (5, 3): "c"}
+    assert sorted(cells) == [(0, 0), (5, 3)]
+
+
+def test_rows_and_columns():
+    cells = CellStore({(0, 0): "a", (0, 4): "b", (3, 4): "c"})
+
+    assert cells.row(0) == {0: "a", 4: "b"}
+    assert cells.column(4) == {0: "b", 3: "c"}
+    assert cells.row(1) == {}
+    assert cells.occupied_rows() == {0, 3}
+    assert cells.occupied_columns() == {0, 4}
+
+
+def test_copy_is_independent():
+    cells = CellStore({(1, 1): "a"})
+    copy = cells.copy()
+    copy[(1, 1)] = "b"
+    copy[(2, 2)] = "c"
+
+    assert cells == {(1, 1): "a"}
+    assert not CellStore()
+
+
+def _swapped(cells, axis, a, b):
+    """Reference swap of two whole rows or columns of a plain dict."""
+    i = 0 if axis == "row" else 1
+    result = {}
+    for key, value in cells.items():
+        key = list(key)
+        key[i] = {a: b, b: a}.get(key[i], key[i])
+        result[tuple(key)] = value
+    return result
+
+
+def test_swaps_match_moving_the_cells():
+    rng = random.Random(9)
+    cells = CellStore()
+    expected = {}
+    for step in range(2000):
+        key = (rng.randrange(12), rng.randrange(8))
+        action = rng.randrange(4)
+        if action == 0:
+            cells[key] = expected[key] = f"v{step}"
+        elif action == 1:
+            assert cells.pop(key, None) == expected.pop(key, None)
+        else:
+            axis = "row" if action == 2 else "column"
+            size = 12 if axis == "row" else 8
+            a, b = rng.randrange(size), rng.randrange(size)
+            (cells.swap_rows if axis == "row" else cells.swap_columns)(a, b)
+            expected = _swapped(expected, axis, a, b)
+        assert len(cells) == len(expected)
+
+    assert dict(cells.items()) == expected
+    assert all(cells.row(row) == {c: v for (r, c), v in expected.items() if r == row} for row in range(12))
+    assert all(cells.column(col) == {r: v for (r, c), v in expected.items() if c == col} for col in range(8))
+
+
+def test_permutation_record_inverse_restores_cells():
+    cells = CellStore({(row, col): f"{row},{col}" for row in range(5) for col in range(3)})
+    original = dict(cells.items())
+    record = PermutationRecord("row", [(0, 4), (1, 4), (2, 3)])
+
+    record.apply(cells)
+    assert cells[(4, 0)] == "1,0"
+    record.inverse().apply(cells)
+
+    assert dict(cells.items()) == original
+    assert PermutationRecord.from_json(record.to_json()).pairs == record.pairs
+
+
+def _bounds(cells):
+    if not cells:
+        return None
+    rows = [row for row, _ in cells]
+    cols = [col for _, col in cells]
+    return min(rows), min(cols), max(rows), max(cols)
+
+
+def test_used_range_follows_writes_deletes_and_swaps():
+    rng = random.Random(11)
+    cells = CellStore()
+    expected = {}
+    for step in range(3000):
+        key = (rng.randrange(20), rng.randrange(10))
+        action = rng.randrange(6)
+        if action < 2:
+            cells[key] = expected[key] = "x"
+        elif action < 4:
+            cells.pop(key, None)
+            expected.pop(key, None)
+        elif action == 4:
+            a, b = rng.randrange(20), rng.randrange(20)
+            cells.swap_rows(a, b)
+            expected = _swapped(expected, "row", a, b)
+        else:
+            a, b = rng.randrange(10), rng.randrange(10)
+            cells.swap_columns(a, b)
+            expected = _swapped(expected, "column", a, b)
+        # asked only now and then, so stale ranges build up in between
+        if rng.random() < 0.3:
+            assert cells.used_range() == _bounds(expected)
+
+    assert cells.used_range() == _bounds(expected)
+
+
+def test_used_range_after_bulk_update_and_clear():
+    cells = CellStore()
+    cells.update({(4, 7): "a", (2, 9): "b"})
+    assert cells.used_range() == (2, 7, 4, 9)
+
+    del cells[(2, 9)]
+    assert cells.used_range() == (4, 7, 4, 7)
+
+    cells.clear()
+    assert cells.used_range() is None
+
+
+def test_rows_in_yields_only_the_filled_cells_of_a_rectangle():
+    rng = random.Random(19)
+    cells = CellStore()
+    expected = {}
+    for _ in range(300):
+        key = (rng.randrange(50), rng.randrange(30))
+        cells[key] = expected[key] = f"{key}"
+    for a, b in ((0, 40), (3, 7)):
+        cells.swap_rows(a, b)
+        cells.swap_columns(a % 30, b % 30)
+        expected = _swapped(_swapped(expected, "row", a, b), "column", a % 30, b % 30)
+
+    # small rectangles walk their own rows and columns, huge ones the
+    # occupied ones
+    for top, left, bottom, right in ((2, 3, 6, 5), (10, 0, 30, 29), (0, 0, 10**6, 10**5)):
+        inside = {
+            (row, col): value for (row, col), value in expected.items()
+            if top <= row <= bottom and left <= col <= right
+        }
+        rows = dict(cells.rows_in(top, left, bottom, right))
+        assert {(row, col): value for row, cols in rows.items() for col, value in cols.items()} == inside
+        assert all(rows.values())
+        assert dict(cells.items_in(top, left, bottom, right)) == inside
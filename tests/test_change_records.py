@@ -0,0 +1,71 @@
+import random
+
+from document import Document
+from models.change_records import BlockRecord, SparseRecord, record_from_changes
+from models.table_model import TableModel
+
+
+def test_cost_counts_string_payloads():
+    small = record_from_changes([((row, 0), "", "x") for row in range(100)])
+    big = record_from_changes([((row, 0), "", f"{row:04d}" * 25_000) for row in range(100)])
+
+    assert isinstance(big, BlockRecord)
+    assert big.cost - small.cost >= 100 * 100_000
+
+
+def test_repeated_values_are_counted_once_per_record():
+    value = "y" * 100_000
+    block = BlockRecord(0, 0, 10, 10, None, [value] * 100)
+    sparse = SparseRecord([((row, 0), "", value) for row in range(100)])
+
+    assert 100_000 < block.cost < 2 * 100_000
+    assert 100_000 < sparse.cost < 2 * 100_000
+
+
+def test_records_pick_their_shape_and_replay_both_ways():
+    dense = [((row, col), "", f"{row},{col}") for row in range(3) for col in range(4)]
+    sparse = [((0, 0), "a", ""), ((500, 90), "", "b"), ((7, 3), "c", "d"), ((2, 2), "", "e")]
+
+    for changes, kind in ((dense, BlockRecord), (sparse, SparseRecord)):
+        record = record_from_changes(changes)
+        assert isinstance(record, kind)
+        assert sorted(record.values(True)) == sorted((pos, new) for pos, _, new in changes)
+        assert sorted(record.values(False)) == sorted((pos, old) for pos, old, _ in changes)
+
+
+def test_random_edits_undo_and_redo_exactly(qapp):
+    rng = random.Random(13)
+    model = TableModel(Document("undo"))
+    cells = model.sheet.cells
+    states = [dict(cells.items())]
+    for step in range(300):
+        last = model.history.peek_undo()
+        action = rng.randrange(5)
+        if action == 0:
+            top, left = rng.randrange(30), rng.randrange(10)
+            block = [[rng.choice(["", "x", f"s{step}"]) for _ in range(rng.randint(1, 6))]
+                     for _ in range(rng.randint(1, 6))]
+            model.write_block(top, left, block)
+        elif action == 1:
+            model.write_cells(
+                {(rng.randrange(200), rng.randrange(40)): f"p{step}" for _ in range(rng.randint(1, 5))}
+            )
+        elif action == 2:
+            top, left = rng.randrange(30), rng.randrange(10)
+            model.clear_rect(top, left, top + rng.randrange(8), left + rng.randrange(8))
+        elif action == 3:
+            model.swap_rows(rng.randrange(40), rng.randrange(40))
+        else:
+            model.swap_columns(rng.randrange(12), rng.randrange(12))
+        if model.history.peek_undo() is not last:
+            states.append(dict(cells.items()))
+
+    assert len(states) > 200
+    for state in reversed(states[:-1]):
+        model.undo()
+        assert dict(cells.items()) == state
+    assert not model.can_undo()
+
+    for state in states[1:]:
+        model.redo()
+        assert dict(cells.items()) == state
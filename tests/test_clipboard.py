@@ -0,0 +1,21 @@
+from views.clipboard import parse_tsv
+
+
+def test_excel_quoting_is_understood():
+    assert parse_tsv('"a\tb\nc"\td\ne\tf') == [["a\tb\nc", "d"], ["e", "f"]]
+
+
+def test_unbalanced_quote_is_taken_literally():
+    text = '"6 inch\tx\ny\tz\n'
+
+    assert parse_tsv(text) == [['"6 inch', "x"], ["y", "z"]]
+
+
+def test_quote_after_a_closing_quote_is_taken_literally():
+    assert parse_tsv('"ab"c\td\ne\tf') == [['"ab"c', "d"], ["e", "f"]]
+
+
+def test_quote_in_the_middle_of_a_cell_is_kept():
+    text = 'say "hi" now\tx\ny\tz'
+
+    assert parse_tsv(text) == [['say "hi" now', "x"], ["y", "z"]]
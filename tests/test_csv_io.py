@@ -0,0 +1,49 @@
+import csv
+
+from cell_store import CellStore
+from csv_io import CsvImport, sniff_dialect, write_csv
+from document import Document
+from mapped_csv import MappedCsv
+
+TRICKY = 'a"b,c\nd'
+
+
+def _import(path):
+    document = Document("csv")
+    document.sheets.clear()
+    job = CsvImport(str(path), document, "csv")
+    # same thread: the worker signals are delivered directly
+    job._run()
+    return document.sheets[0].cells
+
+
+def test_quoted_cells_round_trip(qapp, tmp_path):
+    path = tmp_path / "out.csv"
+    cells = CellStore({(0, 0): "a", (1, 0): TRICKY, (1, 1): "b", (2, 0): "c"})
+    write_csv(cells, str(path))
+
+    imported = _import(path)
+
+    assert dict(imported.items()) == dict(cells.items())
+
+
+def test_quoted_cells_round_trip_in_viewer(qapp, tmp_path):
+    path = tmp_path / "out.csv"
+    write_csv(CellStore({(0, 0): "a", (1, 0): TRICKY, (1, 1): "b", (2, 0): "c"}), str(path))
+
+    source = MappedCsv(str(path))
+    try:
+        source._build_index()
+        assert source.row_count == 3
+        assert source.row(1) == [TRICKY, "b"]
+    finally:
+        source.close()
+
+
+def test_sniffed_dialect_keeps_excel_quoting():
+    dialect = sniff_dialect('id;text\n1;"a""b;c\nd"\n', "data.csv")
+
+    assert dialect.delimiter == ";"
+    assert dialect.doublequote
+    assert dialect.quotechar == '"'
+    assert dialect.quoting == csv.QUOTE_MINIMAL
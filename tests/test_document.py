@@ -0,0 +1,25 @@
+from cell_store import CellStore
+from document import Document, StringPool
+
+
+def test_pool_keeps_values_of_a_sheet_being_imported():
+    pool = Document("import").strings
+    # not in document.sheets until the import finishes
+    cells = CellStore()
+    for row in range(100_000):
+        cells[(row, 0)] = pool.intern(f"value {row % 10_000}")
+
+    assert len(pool) == 10_000
+    assert len({id(value) for value in cells.values()}) == 10_000
+
+
+def test_rebuild_drops_values_nothing_else_holds():
+    pool = StringPool()
+    kept = [pool.intern(f"kept {i}") for i in range(10)]
+    for i in range(10):
+        pool.intern(f"dropped {i}")
+
+    pool.rebuild()
+
+    assert len(pool) == 10
+    assert all(pool.intern(f"kept {i}") is kept[i] for i in range(10))
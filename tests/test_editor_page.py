@@ -0,0 +1,72 @@
+from document import Document, Sheet
+from editor_page import EditorPage
+
+
+def test_switching_sheets_resets_sizes_of_previous_sheet(qapp):
+    document = Document("sizes")
+    document.sheets.append(Sheet("S2"))
+    page = EditorPage(document)
+    rows = page.view.verticalHeader()
+    cols = page.view.horizontalHeader()
+    default_height = rows.defaultSectionSize()
+    default_width = cols.defaultSectionSize()
+
+    rows.resizeSection(2, 50)
+    cols.resizeSection(1, 222)
+    assert document.sheets[0].row_heights == {2: 50}
+    assert document.sheets[0].col_widths == {1: 222}
+
+    page.switch_sheet(1)
+    assert rows.sectionSize(2) == default_height
+    assert cols.sectionSize(1) == default_width
+    assert document.sheets[1].row_heights == {}
+    assert document.sheets[1].col_widths == {}
+
+    page.switch_sheet(0)
+    assert rows.sectionSize(2) == 50
+    assert cols.sectionSize(1) == 222
+
+
+def test_switching_sheets_with_zoom_box_open_keeps_cells(qapp):
+    document = Document("zoom")
+    document.sheets[0].cells[(0, 0)] = "hello"
+    document.sheets.append(Sheet("S2"))
+    page = EditorPage(document)
+    page.show()
+
+    page._set_current_index(0, 0)
+    page.switch_sheet(1)
+    page._set_current_index(0, 0)
+    page.zoom_box_btn.setChecked(True)
+
+    # the zoom box still shows the empty A1 of the sheet being left
+    page.switch_sheet(0)
+    assert document.sheets[0].cells[(0, 0)] == "hello"
+
+    page._set_current_index(1, 1)
+    page.zoom_box_btn.setChecked(True)
+    page.zoom_box.setPlainText("typed")
+    page.switch_sheet(1)
+    assert document.sheets[0].cells[(1, 1)] == "typed"
+    assert (1, 1) not in document.sheets[1].cells
+    page.close()
+
+
+def test_moving_the_current_cell_writes_only_pending_typing(qapp):
+    document = Document("zoom")
+    page = EditorPage(document)
+    page.show()
+    cells = document.sheets[0].cells
+
+    page._set_current_index(0, 0)
+    page.zoom_box_btn.setChecked(True)
+    page.zoom_box.setPlainText("typed")
+    page._set_current_index(1, 0)
+    assert cells[(0, 0)] == "typed"
+
+    # the zoom box shows the old value of a cell changed behind its back
+    cells[(1, 0)] = "changed"
+    page._set_current_index(2, 0)
+    assert cells[(1, 0)] == "changed"
+    assert (2, 0) not in cells
+    page.close()
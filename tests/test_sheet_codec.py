@@ -0,0 +1,54 @@
+import pytest
+
+from document import Sheet
+from sheet_codec import SheetCodecError, decode_sheet, encode_sheet
+
+
+def _sheet():
+    sheet = Sheet("Données 📊")
+    sheet.cells.update({
+        (0, 0): "plain",
+        (0, 1): "plain",
+        (2, 5): "naïve – 日本語 🎉",
+        (70000, 16000): "far\nline\tbreak",
+        (3, 3): "\ud800",  # lone surrogate, as pasted from some apps
+    })
+    sheet.cells.swap_rows(0, 2)
+    sheet.row_heights[4] = 50
+    sheet.col_widths[1] = 222
+    return sheet
+
+
+def test_round_trip():
+    sheet = _sheet()
+
+    data = decode_sheet(encode_sheet(sheet, seq=42))
+
+    assert data["id"] == sheet.id
+    assert data["name"] == sheet.name
+    assert data["seq"] == 42
+    assert dict(data["cells"].items()) == dict(sheet.cells.items())
+    assert data["row_heights"] == {4: 50}
+    assert data["col_widths"] == {1: 222}
+
+
+def test_intern_is_applied_once_per_distinct_value():
+    seen = []
+
+    def intern(value):
+        seen.append(value)
+        return value
+
+    data = decode_sheet(encode_sheet(_sheet()), intern)
+
+    assert sorted(seen) == sorted(set(data["cells"].values()))
+    assert data["cells"][(2, 0)] is data["cells"][(2, 1)]
+
+
+def test_damaged_data_raises():
+    blob = encode_sheet(_sheet())
+
+    with pytest.raises(SheetCodecError):
+        decode_sheet(blob[:-3])
+    with pytest.raises(SheetCodecError):
+        decode_sheet(b"JUNK" + blob[4:])
@@ -0,0 +1,21 @@
+from document import Document
+from sqlite_storage import SqliteWorkspaceStore
+from storage import WorkspaceStore
+
+
+def _save(store, documents):
+    store.write(store.collect(documents))
+
+
+def test_json_workspace_is_migrated_only_once(tmp_path):
+    _save(WorkspaceStore(tmp_path), [Document("from json")])
+
+    store = SqliteWorkspaceStore(tmp_path)
+    documents = store.load()
+    assert [doc.name for doc in documents] == ["from json"]
+    _save(store, documents)
+
+    # the user deletes every document
+    _save(store, [])
+
+    assert SqliteWorkspaceStore(tmp_path).load() == []
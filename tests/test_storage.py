@@ -0,0 +1,144 @@
+import json
+
+import pytest
+
+from document import Document
+from models.change_records import PermutationRecord
+from sqlite_storage import SqliteWorkspaceStore
+from storage import WorkspaceStore
+
+
+@pytest.fixture(params=[WorkspaceStore, SqliteWorkspaceStore])
+def store_class(request):
+    return request.param
+
+
+def _save(store, documents):
+    changes = store.collect(documents)
+    store.write(changes)
+    return changes
+
+
+def test_resize_and_rename_do_not_rewrite_cells(store_class, tmp_path):
+    document = Document("sizes")
+    document.sheets[0].cells[(0, 0)] = "a"
+    _save(store_class(tmp_path), [document])
+
+    store = store_class(tmp_path)
+    document = store.load()[0]
+    sheet = document.sheets[0]
+    sheet.row_heights[2] = 50
+    sheet.col_widths[1] = 222
+    sheet.name = "Renamed"
+    document.dirty = True
+    changes = _save(store, [document])
+
+    assert changes["sheets"] == []
+    assert not sheet.is_loaded
+
+    sheet = store_class(tmp_path).load()[0].sheets[0]
+    assert sheet.name == "Renamed"
+    assert sheet.row_heights == {2: 50}
+    assert sheet.col_widths == {1: 222}
+    assert not sheet.is_loaded
+    assert sheet.cells[(0, 0)] == "a"
+
+
+def test_sizes_come_from_sheet_file_for_older_index(tmp_path):
+    document = Document("old")
+    document.sheets[0].cells[(0, 0)] = "a"
+    document.sheets[0].row_heights[4] = 40
+    _save(WorkspaceStore(tmp_path), [document])
+
+    index_file = tmp_path / "index.json"
+    index = json.loads(index_file.read_text())
+    for sheet_meta in index["documents"][0]["sheets"]:
+        del sheet_meta["row_heights"], sheet_meta["col_widths"]
+    index_file.write_text(json.dumps(index))
+
+    sheet = WorkspaceStore(tmp_path).load()[0].sheets[0]
+    assert sheet.row_heights == {4: 40}
+    assert sheet.cells[(0, 0)] == "a"
+
+
+def test_append_after_torn_journal_line_survives_reload(tmp_path):
+    document = Document("journal")
+    sheet = document.sheets[0]
+    sheet.cells[(0, 0)] = "a"
+    store = WorkspaceStore(tmp_path)
+    _save(store, [document])
+    store.append_journal(store.record(document, sheet, {(1, 0): "before crash"}))
+    store.append_journal(store.record(document, sheet, {(2, 0): "torn"}))
+    store._journal_handle.close()
+    # a crash in the middle of the last append
+    data = store.journal_file.read_bytes()
+    store.journal_file.write_bytes(data[:-10])
+
+    store = WorkspaceStore(tmp_path)
+    document = store.load()[0]
+    sheet = document.sheets[0]
+    store.append_journal(store.record(document, sheet, {(3, 0): "after restart"}))
+    store._journal_handle.close()
+
+    cells = WorkspaceStore(tmp_path).load()[0].sheets[0].cells
+    assert cells[(0, 0)] == "a"
+    assert cells[(1, 0)] == "before crash"
+    assert (2, 0) not in cells
+    assert cells[(3, 0)] == "after restart"
+
+
+def _journal_edits(store, document, sheet):
+    store.append_journal(store.record(document, sheet, {(0, 0): "", (1, 1): "b"}))
+    sheet.cells.pop((0, 0))
+    sheet.cells[(1, 1)] = "b"
+    store.append_journal(store.record_permutation(document, sheet, PermutationRecord("row", [(1, 5)])))
+    sheet.cells.swap_rows(1, 5)
+
+
+def test_journal_replays_on_load(tmp_path):
+    document = Document("journal")
+    sheet = document.sheets[0]
+    sheet.cells.update({(0, 0): "a", (1, 0): "c"})
+    store = WorkspaceStore(tmp_path)
+    _save(store, [document])
+    _journal_edits(store, document, sheet)
+    store._journal_handle.close()
+
+    loaded = WorkspaceStore(tmp_path).load()[0].sheets[0]
+
+    assert dict(loaded.cells.items()) == {(5, 0): "c", (5, 1): "b"}
+
+
+def test_compaction_snapshots_sheets_and_empties_the_journal(tmp_path):
+    document = Document("journal")
+    sheet = document.sheets[0]
+    sheet.cells.update({(0, 0): "a", (1, 0): "c"})
+    store = WorkspaceStore(tmp_path)
+    _save(store, [document])
+    _journal_edits(store, document, sheet)
+
+    changes = store.collect([document], compact=True)
+    assert [saved.id for _, saved, _ in changes["sheets"]] == [sheet.id]
+    store.write(changes)
+
+    assert store.journal_file.read_text() == ""
+    loaded = WorkspaceStore(tmp_path).load()[0].sheets[0]
+    assert dict(loaded.cells.items()) == {(5, 0): "c", (5, 1): "b"}
+
+
+def test_records_covered_by_a_snapshot_are_not_replayed(tmp_path):
+    document = Document("journal")
+    sheet = document.sheets[0]
+    sheet.cells.update({(0, 0): "a", (1, 0): "c"})
+    store = WorkspaceStore(tmp_path)
+    _save(store, [document])
+    _journal_edits(store, document, sheet)
+
+    # a crash after the snapshots were written but before the truncation
+    changes = store.collect([document], compact=True)
+    changes["truncate_journal"] = False
+    store.write(changes)
+    store._journal_handle.close()
+
+    loaded = WorkspaceStore(tmp_path).load()[0].sheets[0]
+    assert dict(loaded.cells.items()) == {(5, 0): "c", (5, 1): "b"}
@@ -0,0 +1,39 @@
+from document import Document
+from models.table_model import TableModel
+
+
+def test_reused_typing_session_does_not_merge_into_another_cell(qapp):
+    model = TableModel(Document("typing"))
+    cells = model.sheet.cells
+
+    model.write_typed_text(0, 0, "a", session=1)
+    model.write_typed_text(0, 0, "ab", session=1)
+    model.write_typed_text(1, 1, "b", session=1)
+
+    model.undo()
+    assert cells.get((1, 1)) is None
+    assert cells[(0, 0)] == "ab"
+
+    model.undo()
+    assert cells.get((0, 0)) is None
+
+
+def test_swapping_rows_and_columns_undoes_and_redoes(qapp):
+    model = TableModel(Document("swaps"))
+    cells = model.sheet.cells
+    cells.update({(0, 0): "a", (0, 1): "b", (3, 1): "c"})
+    permuted = []
+    model.cells_permuted.connect(lambda sheet, record: permuted.append(record.axis))
+
+    model.swap_rows(0, 3)
+    model.swap_columns(0, 1)
+    assert dict(cells.items()) == {(3, 1): "a", (3, 0): "b", (0, 0): "c"}
+
+    model.undo()
+    model.undo()
+    assert dict(cells.items()) == {(0, 0): "a", (0, 1): "b", (3, 1): "c"}
+
+    model.redo()
+    model.redo()
+    assert dict(cells.items()) == {(3, 1): "a", (3, 0): "b", (0, 0): "c"}
+    assert permuted == ["row", "column", "column", "row", "row", "column"]
@@ -0,0 +1,83 @@
+import multiprocessing
+import threading
+import time
+
+from openpyxl import Workbook
+
+import workbook_import
+from document import Document, Sheet
+from sheet_codec import encode_sheet
+from workbook_import import WorkbookImport
+
+
+def _packed(name, value):
+    sheet = Sheet(name)
+    sheet.cells = {(0, 0): value}
+    return encode_sheet(sheet)
+
+
+def test_pool_sheets_keep_workbook_order_while_user_edits_sheets(qapp):
+    document = Document("book")
+    document.sheets.clear()
+    job = WorkbookImport("book.xlsx", document)
+    added = []
+    job.sheet_added.connect(lambda sheet, done, count: added.append((sheet.name, done, count)))
+
+    job._pool_started.emit(["S0", "S1", "S2", "S3"])
+    job._sheet_packed.emit(0, _packed("S0", "a"))
+    user_sheet = Sheet("UserAdded")
+    document.sheets.append(user_sheet)
+    job._sheet_packed.emit(2, _packed("S2", "c"))
+    job._sheet_packed.emit(1, _packed("S1", "b"))
+    assert [sheet.name for sheet in document.sheets] == ["S0", "UserAdded", "S1", "S2"]
+
+    document.sheets.remove(user_sheet)
+    job._sheet_packed.emit(3, _packed("S3", "d"))
+
+    assert [sheet.name for sheet in document.sheets] == ["S0", "S1", "S2", "S3"]
+    assert [sheet.cells[(0, 0)] for sheet in document.sheets] == ["a", "b", "c", "d"]
+    assert added == [("S0", 1, 4), ("S1", 2, 4), ("S2", 3, 4), ("S3", 4, 4)]
+    assert job._packed == {}
+
+
+def _slow_sheet_task(task):
+    time.sleep(60)
+
+
+def test_cancel_stops_sheets_being_read_in_processes(qapp, monkeypatch):
+    monkeypatch.setattr(workbook_import, "_read_sheet_task", _slow_sheet_task)
+    job = WorkbookImport("book.xlsx", Document("book"))
+    finished = []
+    job.finished.connect(finished.append)
+
+    # late enough for the processes to be reading
+    threading.Timer(3, job.cancel).start()
+    started = time.monotonic()
+    job._read_in_processes(["S0", "S1"])
+
+    assert time.monotonic() - started < 20
+    assert finished == [False]
+    assert multiprocessing.active_children() == []
+
+
+def test_serial_import_reads_cells(qapp, tmp_path):
+    path = tmp_path / "book.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["name", 0, None, 1.5])
+    ws.append([None, "", "x"])
+    wb.save(path)
+    document = Document("book")
+    document.sheets.clear()
+    job = WorkbookImport(str(path), document)
+    finished = []
+    job.finished.connect(finished.append)
+
+    job._run()
+
+    assert finished == [True]
+    assert [sheet.name for sheet in document.sheets] == ["Data"]
+    assert dict(document.sheets[0].cells.items()) == {
+        (0, 0): "name", (0, 1): "0", (0, 3): "1.5", (1, 2): "x",
+    }
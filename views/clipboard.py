@@ -0,0 +1,253 @@
+"""Clipboard contents for copying and pasting ranges of cells.
+
+Plain text (tab-separated, the format Excel reads) is written when the
+copy happens. HTML and CSV are only rendered if the application the
+user pastes into asks for them. Large pastes are parsed on a worker
+thread and written in chunks by PasteJob.
+"""
+
+import csv
+import html
+import io
+import threading
+
+from PySide6.QtCore import QByteArray, QMimeData, QObject, Qt, QTimer, Signal
+from PySide6.QtWidgets import QApplication, QProgressDialog
+
+
+_TSV_SPECIAL = ("\t", "\n", "\r")
+
+
+def _tsv_field(value):
+    # a cell holding a tab or line break, or starting with a quote, is
+    # wrapped in quotes with inner quotes doubled, as Excel does; its own
+    # line breaks are kept as they are, inside the quotes
+    if value.startswith('"') or any(ch in value for ch in _TSV_SPECIAL):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _needs_quoting(values):
+    joined = "\t".join(values)
+    return (
+        joined.count("\t") != len(values) - 1
+        or "\n" in joined
+        or "\r" in joined
+        or '"' in joined
+    )
+
+
+class SelectionMimeData(QMimeData):
+    """Cells of a copied rectangle.
+
+    `rows` is {row: {col: value}} holding only the filled cells of `rect`
+    (top, left, bottom, right), so copying a large, mostly blank range
+    stays cheap.
+    """
+
+    LAZY_FORMATS = ("text/html", "text/csv")
+
+    def __init__(self, rows, rect):
+        super().__init__()
+        self._rows = rows
+        self._rect = rect
+        self._rendered = {}
+        self.setText(self.to_tsv())
+
+    def _lines(self):
+        """Yield (number of blank rows, None) or (0, [value, ...]) in order."""
+        top, left, bottom, right = self._rect
+        width = right - left + 1
+        blank_run = 0
+        for row in range(top, bottom + 1):
+            cols = self._rows.get(row)
+            if cols is None:
+                blank_run += 1
+                continue
+            if blank_run:
+                yield blank_run, None
+                blank_run = 0
+            values = [""] * width
+            for col, value in cols.items():
+                values[col - left] = value
+            yield 0, values
+        if blank_run:
+            yield blank_run, None
+
+    def to_tsv(self):
+        top, left, bottom, right = self._rect
+        blank = "\t" * (right - left) + "\n"
+        buffer = io.StringIO()
+        for blank_rows, values in self._lines():
+            if values is None:
+                buffer.write(blank * blank_rows)
+                continue
+            if _needs_quoting(values):
+                values = [_tsv_field(value) for value in values]
+            buffer.write("\t".join(values))
+            buffer.write("\n")
+        # rows are separated by "\n" alone, never "\r\n", and the last row
+        # has none after it, so pasting does not add a blank row
+        return buffer.getvalue()[:-1]
+
+    def to_html(self):
+        top, left, bottom, right = self._rect
+        blank = "<tr>" + "<td></td>" * (right - left + 1) + "</tr>"
+        buffer = io.StringIO()
+        buffer.write("<table>")
+        for blank_rows, values in self._lines():
+            if values is None:
+                buffer.write(blank * blank_rows)
+                continue
+            buffer.write("<tr>")
+            for value in values:
+                buffer.write("<td>" + html.escape(value) + "</td>")
+            buffer.write("</tr>")
+        buffer.write("</table>")
+        return buffer.getvalue()
+
+    def to_csv(self):
+        top, left, bottom, right = self._rect
+        blank = "," * (right - left) + "\r\n"
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\r\n")
+        for blank_rows, values in self._lines():
+            if values is None:
+                buffer.write(blank * blank_rows)
+            else:
+                writer.writerow(values)
+        return buffer.getvalue()
+
+    def formats(self):
+        return super().formats() + list(self.LAZY_FORMATS)
+
+    def hasFormat(self, mime_type):
+        return mime_type in self.LAZY_FORMATS or super().hasFormat(mime_type)
+
+    def retrieveData(self, mime_type, preferred_type):
+        if mime_type not in self.LAZY_FORMATS:
+            return super().retrieveData(mime_type, preferred_type)
+        data = self._rendered.get(mime_type)
+        if data is None:
+            text = self.to_html() if mime_type == "text/html" else self.to_csv()
+            data = self._rendered[mime_type] = QByteArray(text.encode("utf-8"))
+        return data
+
+
+def parse_tsv(text, cancelled=None):
+    """Split tab-separated clipboard text into rows of values.
+
+    Understands Excel's quoting, so cells holding tabs or line breaks
+    survive. `cancelled`, if given, is polled every few thousand rows;
+    parsing then stops and returns None.
+    """
+    rows = []
+    # strict: a quote left open, or text after a closing quote, is an
+    # error rather than one cell swallowing the rest of the text
+    reader = csv.reader(io.StringIO(text, newline=""), dialect="excel-tab", strict=True)
+    try:
+        for row in reader:
+            rows.append(row or [""])
+            if cancelled is not None and len(rows) % 4096 == 0 and cancelled():
+                return None
+    except csv.Error:
+        # not something Excel wrote (or a cell over csv's size limit):
+        # take the text literally
+        rows = [line.split("\t") for line in text.splitlines()]
+    return rows or [[""]]
+
+
+class PasteJob(QObject):
+    """Paste a large block of text without freezing the window.
+
+    The text is parsed on a worker thread, then written to the model
+    about CHUNK_CELLS cells at a time from the event loop behind a progress
+    dialog. All chunks form one compound action, so the paste is one
+    undo step. Cancelling stops the paste; rows already written stay and
+    are undone together.
+    """
+
+    CHUNK_CELLS = 20000
+
+    finished = Signal()
+    _parsed = Signal(object)
+
+    def __init__(self, model, text, top, left, parent=None):
+        super().__init__(parent)
+        self._model = model
+        self._text = text
+        self._top = top
+        self._left = left
+        self._rows = None
+        self._next = 0
+        self._cancelled = threading.Event()
+
+        self._dialog = QProgressDialog("Reading clipboard…", "Cancel", 0, 0, parent)
+        self._dialog.setWindowTitle("Paste")
+        self._dialog.setWindowModality(Qt.WindowModal)
+        self._dialog.setAutoClose(False)
+        self._dialog.setAutoReset(False)
+        self._dialog.canceled.connect(self._cancelled.set)
+        self._parsed.connect(self._start_writing)
+
+    def start(self):
+        self._dialog.show()
+        threading.Thread(target=self._parse, name="excelify-paste", daemon=True).start()
+
+    def _parse(self):
+        rows = parse_tsv(self._text, self._cancelled.is_set)
+        self._text = None
+        # queued to the GUI thread
+        self._parsed.emit(rows)
+
+    def _start_writing(self, rows):
+        if rows is None or self._cancelled.is_set():
+            self._finish()
+            return
+        self._rows = rows
+        self._dialog.setLabelText("Pasting…")
+        self._dialog.setRange(0, len(rows))
+        self._model.begin_compound_action()
+        self._write_chunk()
+
+    def _write_chunk(self):
+        if self._cancelled.is_set() or self._dialog.wasCanceled():
+            self._model.end_compound_action()
+            self._finish()
+            return
+
+        end = self._next
+        cells = 0
+        while end < len(self._rows) and cells < self.CHUNK_CELLS:
+            cells += len(self._rows[end])
+            end += 1
+        self._model.write_block(self._top + self._next, self._left, self._rows[self._next:end])
+        self._next = end
+        self._dialog.setValue(end)
+
+        if end < len(self._rows):
+            QTimer.singleShot(0, self._write_chunk)
+            return
+        self._model.end_compound_action()
+        self._finish()
+
+    def _finish(self):
+        self._rows = None
+        self._dialog.close()
+        self._dialog.deleteLater()
+        self.finished.emit()
+
+
+def detach_clipboard():
+    """Swap our clipboard data for plain data before the app quits.
+
+    Qt still owns the clipboard contents after Python has shut down, and
+    must not call back into SelectionMimeData then.
+    """
+    clipboard = QApplication.clipboard()
+    mime_data = clipboard.mimeData()
+    if not isinstance(mime_data, SelectionMimeData):
+        return
+    plain = QMimeData()
+    plain.setText(mime_data.text())
+    clipboard.setMimeData(plain)
@@ -4,6 +4,8 @@ from PySide6.QtCore import QItemSelectionModel
 from PySide6.QtGui import QPainter, QColor, QKeySequence, QPen
 from PySide6.QtWidgets import QStyle
 
+from views.clipboard import PasteJob, SelectionMimeData, parse_tsv
+
 
 class _NoFocusSelectionDelegate(QStyledItemDelegate):
     def paint(self, painter, option, index):
@@ -16,6 +18,11 @@ class TableView(QTableView):
     block_swap_requested = Signal(tuple, tuple)
     selection_finalized = Signal()
     # ((r1,c1,r2,c2), (dest_r1,dest_c1))
+
+    # pastes with more lines than this are parsed off the GUI thread and
+    # written in chunks behind a progress dialog
+    LARGE_PASTE_ROWS = 5000
+
     def __init__(self):
         super().__init__()
 
@@ -40,7 +47,11 @@ class TableView(QTableView):
         self._drag_start_pos = None
         
         self._drag_start_index = None
+        # see _selection_bounds
+        self._selection_bounds_cache = None
+        self._selection_bounds_valid = False
         self.zoom_box = None
+        self._paste_job = None
         self.setItemDelegate(_NoFocusSelectionDelegate(self))
 
         self.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -119,7 +130,15 @@ class TableView(QTableView):
                 return
 
         if event.matches(QKeySequence.Copy):
-            self._copy_selection_to_clipboard(rect)
+            self._copy_selection_to_clipboard()
+            return
+
+        # a read-only model only allows copying
+        if self._is_read_only() and (
+            event.matches(QKeySequence.Paste)
+            or event.matches(QKeySequence.Cut)
+            or event.key() == Qt.Key_Delete
+        ):
             return
 
         if event.matches(QKeySequence.Paste):
@@ -134,6 +153,14 @@ class TableView(QTableView):
             self._invoke_action("_run_delete_action", "_delete_selection_contents")
             return
 
+        # Ctrl+End goes to the last used cell, not the end of the grid
+        if event.key() == Qt.Key_End and event.modifiers() & Qt.ControlModifier:
+            used_range = getattr(self.model(), "used_range", None)
+            used = used_range() if callable(used_range) else None
+            if used is not None:
+                self.setCurrentIndex(self.model().index(used[2], used[3]))
+                return
+
         super().keyPressEvent(event)
 
     def mouseMoveEvent(self, event):
@@ -159,28 +186,23 @@ class TableView(QTableView):
             painter.setBrush(QColor(37, 109, 133, 45))
             painter.drawRect(self._ghost_rect)
 
-        selection = self.selectionModel()
-        if selection is None:
-            return
-
-        selected = selection.selectedIndexes()
-        if not selected:
+        bounds = self._selection_bounds()
+        if bounds is None:
             return
 
         accent = QColor(37, 109, 133)
+        top, left, bottom, right = bounds
+        top_left = self.model().index(top, left)
 
-        if len(selected) == 1:
-            rect = self.visualRect(selected[0]).adjusted(1, 1, -1, -1)
+        if (top, left) == (bottom, right):
+            rect = self.visualRect(top_left).adjusted(1, 1, -1, -1)
             if rect.isValid():
                 painter.setPen(QPen(accent, 2))
                 painter.setBrush(Qt.NoBrush)
                 painter.drawRect(rect)
             return
 
-        rows = [idx.row() for idx in selected]
-        cols = [idx.column() for idx in selected]
-        top_left = self.model().index(min(rows), min(cols))
-        bottom_right = self.model().index(max(rows), max(cols))
+        bottom_right = self.model().index(bottom, right)
         selection_rect = self.visualRect(top_left).united(self.visualRect(bottom_right)).adjusted(1, 1, -1, -1)
 
         if selection_rect.isValid():
@@ -200,17 +222,10 @@ class TableView(QTableView):
             self.setSelectionMode(self._saved_selection_mode)
 
             end_index = self.indexAt(event.pos())
-            selected = self.selectionModel().selectedIndexes()
+            src_rect = self._selection_bounds()
             mode = self.get_swap_mode()
 
-            if end_index.isValid() and selected:
-                rows = [i.row() for i in selected]
-                cols = [i.column() for i in selected]
-
-                src_rect = (
-                    min(rows), min(cols),
-                    max(rows), max(cols)
-                )
+            if end_index.isValid() and src_rect is not None:
 
                 dest_top_left = (
                     end_index.row(),
@@ -266,15 +281,13 @@ class TableView(QTableView):
         mode = self.get_swap_mode()
 
         if mode == "rectangle":
-            rows = [i.row() for i in self.selectionModel().selectedIndexes()]
-            cols = [i.column() for i in self.selectionModel().selectedIndexes()]
-
-            if not rows or not cols:
+            bounds = self._selection_bounds()
+            if bounds is None:
                 self._ghost_rect = None
                 return
 
-            h = max(rows) - min(rows) + 1
-            w = max(cols) - min(cols) + 1
+            h = bounds[2] - bounds[0] + 1
+            w = bounds[3] - bounds[1] + 1
 
             top_left = index
             bottom_right = self.model().index(
@@ -327,6 +340,12 @@ class TableView(QTableView):
         swap_action = menu.addAction("Swap Rectangle")
         remove_spaces_action = menu.addAction("Remove Spaces")
         uppercase_action = menu.addAction("Turn to Uppercase")
+        if self._is_read_only():
+            for editing_action in (
+                cut_action, paste_action, delete_action, swap_action,
+                remove_spaces_action, uppercase_action,
+            ):
+                editing_action.setEnabled(False)
         target_rect = self._selected_rect()
         action = menu.exec(self.viewport().mapToGlobal(pos))
 
@@ -358,6 +377,25 @@ class TableView(QTableView):
         if callable(primary):
             primary(*args, **kwargs)
 
+    def currentChanged(self, current, previous):
+        super().currentChanged(current, previous)
+        # moving near the edge of the grid makes room past the cursor
+        grow_to = getattr(self.model(), "grow_to", None)
+        if callable(grow_to) and current.isValid():
+            grow_to(current.row(), current.column())
+
+    def horizontalScrollbarValueChanged(self, value):
+        # the base class would call fetchMore(), which adds rows
+        bar = self.horizontalScrollBar()
+        fetch_more_columns = getattr(self.model(), "fetch_more_columns", None)
+        if value == bar.maximum() and callable(fetch_more_columns):
+            fetch_more_columns()
+            return
+        super().horizontalScrollbarValueChanged(value)
+
+    def _is_read_only(self):
+        return getattr(self.model(), "read_only", False)
+
     def clear_swap_mode(self):
         self.swap_mode = None
 
@@ -375,21 +413,54 @@ class TableView(QTableView):
         if next_index.isValid():
             self.setCurrentIndex(next_index)
 
-    def _selected_rect(self):
+    def setModel(self, model):
+        super().setModel(model)
+        self._selection_bounds_valid = False
+
+    def selectionChanged(self, selected, deselected):
+        super().selectionChanged(selected, deselected)
+        self._selection_bounds_valid = False
+
+    def _selection_bounds(self):
+        """(top, left, bottom, right) around every selected cell, or None.
+
+        Read from the selection's ranges rather than selectedIndexes(), so
+        selecting a whole column or the whole sheet costs no more than one
+        cell. Cached until the selection or the model changes.
+        """
+        if self._selection_bounds_valid:
+            return self._selection_bounds_cache
+
+        bounds = None
         selection = self.selectionModel()
-        if selection is None:
+        if selection is not None:
+            for selected_range in selection.selection():
+                if not selected_range.isValid():
+                    continue
+                top, left = selected_range.top(), selected_range.left()
+                bottom, right = selected_range.bottom(), selected_range.right()
+                if bounds is not None:
+                    top = min(top, bounds[0])
+                    left = min(left, bounds[1])
+                    bottom = max(bottom, bounds[2])
+                    right = max(right, bounds[3])
+                bounds = (top, left, bottom, right)
+
+        self._selection_bounds_cache = bounds
+        self._selection_bounds_valid = True
+        return bounds
+
+    def _selected_rect(self):
+        if self.selectionModel() is None:
             return None
 
-        selected = selection.selectedIndexes()
-        if not selected:
+        bounds = self._selection_bounds()
+        if bounds is None:
             index = self.currentIndex()
             if not index.isValid():
                 return None
             return index.row(), index.column(), index.row(), index.column()
-
-        rows = [i.row() for i in selected]
-        cols = [i.column() for i in selected]
-        return min(rows), min(cols), max(rows), max(cols)
+        return bounds
 
     def _selected_positions(self, rect):
         if rect is None:
@@ -403,11 +474,18 @@ class TableView(QTableView):
         ]
 
     def _clear_rect_contents(self, rect):
+        if rect is None:
+            return False
+
+        model = self.model()
+        clear_rect = getattr(model, "clear_rect", None)
+        if callable(clear_rect):
+            return bool(clear_rect(*rect))
+
         positions = self._selected_positions(rect)
         if not positions:
             return False
 
-        model = self.model()
         clear_cells = getattr(model, "clear_cells", None)
         if callable(clear_cells):
             return bool(clear_cells(positions))
@@ -433,16 +511,20 @@ class TableView(QTableView):
         if rect is None:
             return
 
-        r1, c1, r2, c2 = rect
-        lines = []
-        for r in range(r1, r2 + 1):
-            row_values = []
-            for c in range(c1, c2 + 1):
-                value = self.model().data(self.model().index(r, c), Qt.DisplayRole)
-                row_values.append("" if value is None else str(value))
-            lines.append("\t".join(row_values))
+        model = self.model()
+        rows_in_rect = getattr(model, "rows_in_rect", None)
+        if callable(rows_in_rect):
+            rows = rows_in_rect(*rect)
+        else:
+            r1, c1, r2, c2 = rect
+            rows = {}
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    value = model.data(model.index(r, c), Qt.DisplayRole)
+                    if value not in (None, ""):
+                        rows.setdefault(r, {})[c] = str(value)
 
-        QApplication.clipboard().setText("\n".join(lines))
+        QApplication.clipboard().setMimeData(SelectionMimeData(rows, rect))
 
     def _paste_clipboard_to_selection(self, rect=None):
         text = QApplication.clipboard().text()
@@ -454,15 +536,27 @@ class TableView(QTableView):
             return
 
         model = self.model()
+        start_row, start_col, _, _ = rect
+
+        write_block = getattr(model, "write_block", None)
+        if callable(write_block) and text.count("\n") > self.LARGE_PASTE_ROWS:
+            if self._paste_job is None:
+                self._paste_job = PasteJob(model, text, start_row, start_col, self)
+                self._paste_job.finished.connect(self._on_paste_finished)
+                self._paste_job.start()
+            return
+
+        rows = parse_tsv(text)
+        if callable(write_block):
+            write_block(start_row, start_col, rows)
+            return
+
         begin_macro = getattr(model, "begin_macro", None)
         end_macro = getattr(model, "end_macro", None)
         if callable(begin_macro):
             begin_macro()
         try:
-            start_row, start_col, _, _ = rect
-            rows = text.splitlines() or [""]
-            for r_offset, row_text in enumerate(rows):
-                cols = row_text.split("\t")
+            for r_offset, cols in enumerate(rows):
                 for c_offset, value in enumerate(cols):
                     index = model.index(start_row + r_offset, start_col + c_offset)
                     if index.isValid():
@@ -471,6 +565,10 @@ class TableView(QTableView):
             if callable(end_macro):
                 end_macro()
 
+    def _on_paste_finished(self):
+        self._paste_job.deleteLater()
+        self._paste_job = None
+
     def _cut_selection_to_clipboard(self, rect=None):
         rect = rect or self._selected_rect()
         if rect is None:
@@ -491,17 +589,17 @@ class TableView(QTableView):
         if rect is None:
             return
 
-        positions = self._selected_positions(rect)
-        if not positions:
-            return
-
         model = self.model()
-        begin_macro = getattr(model, "begin_macro", None)
-        end_macro = getattr(model, "end_macro", None)
-        if callable(begin_macro):
-            begin_macro()
-        try:
-            for row, col in positions:
+        updates = {}
+        cells_in_rect = getattr(model, "cells_in_rect", None)
+        if callable(cells_in_rect):
+            # only filled cells can change
+            for pos, source in cells_in_rect(*rect):
+                updated = transform(source)
+                if updated != source:
+                    updates[pos] = updated
+        else:
+            for row, col in self._selected_positions(rect):
                 index = model.index(row, col)
                 if not index.isValid():
                     continue
@@ -515,7 +613,23 @@ class TableView(QTableView):
                 source = value if isinstance(value, str) else str(value)
                 updated = transform(source)
                 if updated != source:
-                    model.setData(index, updated, Qt.EditRole)
+                    updates[(row, col)] = updated
+
+        if not updates:
+            return
+
+        write_cells = getattr(model, "write_cells", None)
+        if callable(write_cells):
+            write_cells(updates)
+            return
+
+        begin_macro = getattr(model, "begin_macro", None)
+        end_macro = getattr(model, "end_macro", None)
+        if callable(begin_macro):
+            begin_macro()
+        try:
+            for (row, col), updated in updates.items():
+                model.setData(model.index(row, col), updated, Qt.EditRole)
         finally:
             if callable(end_macro):
                 end_macro()
@@ -0,0 +1,226 @@
+"""Importing .xlsx workbooks without blocking the GUI.
+
+The workbook is streamed with openpyxl's read-only mode on a worker
+thread. Cells reach the GUI thread in chunks and are added to a sheet
+that joins the document once it has been read completely, so a sheet
+the user can see never changes underneath them.
+
+On machines with more than one core, large workbooks with several
+sheets are read by a pool of processes instead, one sheet per task; each
+task returns its sheet packed with sheet_codec.
+"""
+
+import multiprocessing
+import os
+import threading
+
+from openpyxl import load_workbook
+from PySide6.QtCore import QObject, Signal
+
+from document import Sheet
+from import_chunks import CHUNK_CELLS, iter_cell_chunks
+from sheet_codec import decode_sheet, encode_sheet
+
+# smaller files are read on one thread; starting processes costs more
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+
+
+def iter_sheet_chunks(ws, cancelled, chunk_cells=CHUNK_CELLS):
+    """Yield lists of ((row, col), text) for the filled cells of a worksheet.
+
+    `ws` is a read-only worksheet; rows and columns are 0-based. Stops
+    early once `cancelled()` returns True.
+    """
+    rows = ws.iter_rows(min_row=1, min_col=1, values_only=True)
+    return iter_cell_chunks(rows, cancelled, chunk_cells)
+
+
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# the workbook a pool process has open; opening parses the whole
+# shared-strings table, so each process does it once, not once per sheet
+_open_workbook = None
+
+
+def read_sheet_packed(path, index):
+    """Read one worksheet of `path`; runs in a pool process.
+
+    Returns the sheet encoded with sheet_codec, which pickles as a single
+    bytes object and decodes quickly in the parent.
+    """
+    global _open_workbook
+    if _open_workbook is None or _open_workbook[0] != path:
+        if _open_workbook is not None:
+            _open_workbook[1].close()
+        _open_workbook = (path, load_workbook(path, read_only=True, data_only=True))
+
+    ws = _open_workbook[1].worksheets[index]
+    cells = {}
+    for chunk in iter_sheet_chunks(ws, lambda: False):
+        cells.update(chunk)
+    sheet = Sheet(ws.title)
+    sheet.cells = cells
+    return encode_sheet(sheet)
+
+
+def _read_sheet_task(task):
+    path, index = task
+    return index, read_sheet_packed(path, index)
+
+
+class WorkbookImport(QObject):
+    """Read the sheets of an .xlsx file into `document`.
+
+    `sheet_added` fires as each sheet is completed and appended to
+    `document.sheets`; `finished` fires once at the end, with False if
+    the import was cancelled. Sheets read before a cancel are kept.
+
+    Sheets are always added in workbook order, also when they are read in
+    parallel and finish out of order.
+    """
+
+    sheet_added = Signal(object, int, int)  # sheet, sheets done, sheet count
+    progress = Signal(int, int, str, int)  # sheet index, sheet count, title, rows
+    finished = Signal(bool)
+    failed = Signal(str)
+
+    # worker -> GUI thread
+    _sheet_started = Signal(int, int, str)
+    _cells_read = Signal(object, int)
+    _sheet_read = Signal()
+    _pool_started = Signal(object)  # sheet titles
+    _sheet_packed = Signal(int, object)  # index, sheet_codec bytes
+    _done = Signal(bool)
+    _error = Signal(str)
+
+    def __init__(self, path, document, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.document = document
+        self._cancelled = threading.Event()
+        self._sheet = None
+        self._sheet_index = 0
+        self._sheet_count = 0
+        self._titles = []
+        self._packed = {}  # index -> sheet_codec bytes, waiting for earlier sheets
+        # next workbook sheet to append; the user may add or delete sheets
+        # of the document meanwhile, so its length says nothing
+        self._next_index = 0
+
+        self._sheet_started.connect(self._on_sheet_started)
+        self._cells_read.connect(self._on_cells_read)
+        self._sheet_read.connect(self._on_sheet_read)
+        self._pool_started.connect(self._on_pool_started)
+        self._sheet_packed.connect(self._on_sheet_packed)
+        self._done.connect(self.finished)
+        self._error.connect(self.failed)
+
+    def start(self):
+        threading.Thread(target=self._run, name="excelify-import", daemon=True).start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _run(self):
+        try:
+            wb = load_workbook(self.path, read_only=True, data_only=True)
+        except Exception as e:
+            self._error.emit(str(e))
+            return
+
+        try:
+            worksheets = wb.worksheets
+            if (
+                len(worksheets) > 1
+                and available_cpus() > 1
+                and os.path.getsize(self.path) >= PARALLEL_MIN_BYTES
+            ):
+                titles = [ws.title for ws in worksheets]
+                wb.close()
+                self._read_in_processes(titles)
+                return
+            for index, ws in enumerate(worksheets):
+                if self._cancelled.is_set():
+                    break
+                self._sheet_started.emit(index, len(worksheets), ws.title)
+                for chunk in iter_sheet_chunks(ws, self._cancelled.is_set):
+                    self._cells_read.emit(chunk, chunk[-1][0][0] + 1)
+                if self._cancelled.is_set():
+                    break
+                self._sheet_read.emit()
+        except Exception as e:
+            self._error.emit(str(e))
+            return
+        finally:
+            wb.close()
+
+        self._done.emit(not self._cancelled.is_set())
+
+    def _read_in_processes(self, titles):
+        count = len(titles)
+        workers = min(count, available_cpus())
+        # spawn, not fork: this process has Qt and autosave threads running
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(workers)
+        try:
+            self._pool_started.emit(titles)
+            results = pool.imap_unordered(
+                _read_sheet_task, [(self.path, index) for index in range(count)]
+            )
+            received = 0
+            while received < count and not self._cancelled.is_set():
+                try:
+                    index, blob = results.next(timeout=0.2)
+                except multiprocessing.TimeoutError:
+                    continue
+                received += 1
+                self._sheet_packed.emit(index, blob)
+        except Exception as e:
+            self._error.emit(str(e))
+            return
+        finally:
+            # on cancel this kills the sheets still being read rather than
+            # waiting for them; otherwise the processes are idle by now
+            pool.terminate()
+            pool.join()
+
+        self._done.emit(not self._cancelled.is_set())
+
+    def _on_pool_started(self, titles):
+        self._titles = titles
+        self.progress.emit(0, len(titles), titles[0], 0)
+
+    def _on_sheet_packed(self, index, blob):
+        if self._cancelled.is_set():
+            return
+        count = len(self._titles)
+        self._packed[index] = blob
+        while self._next_index in self._packed:
+            data = decode_sheet(self._packed.pop(self._next_index), self.document.strings.intern)
+            sheet = Sheet(data["name"])
+            sheet.cells = data["cells"]
+            self.document.sheets.append(sheet)
+            self._next_index += 1
+            self.sheet_added.emit(sheet, self._next_index, count)
+        if self._next_index < count:
+            self.progress.emit(self._next_index, count, self._titles[self._next_index], 0)
+
+    def _on_sheet_started(self, index, count, title):
+        self._sheet = Sheet(title)
+        self._sheet_index = index
+        self._sheet_count = count
+        self.progress.emit(index, count, title, 0)
+
+    def _on_cells_read(self, chunk, rows):
+        intern = self.document.strings.intern
+        self._sheet.cells.update((key, intern(value)) for key, value in chunk)
+        self.progress.emit(self._sheet_index, self._sheet_count, self._sheet.name, rows)
+
+    def _on_sheet_read(self):
+        sheet, self._sheet = self._sheet, None
+        self.document.sheets.append(sheet)
+        self.sheet_added.emit(sheet, self._sheet_index + 1, self._sheet_count)